@@ -1,4 +1,14 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import (
+    Flask,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    jsonify,
+    Response,
+    stream_with_context,
+)
 from flask_login import (
     LoginManager,
     login_user,
@@ -10,32 +20,140 @@ from werkzeug.security import (
     generate_password_hash,
     check_password_hash,
 )
-import joblib
-import pandas as pd
+import click
+import json
+import math
+import multiprocessing
+import os
+import queue
+import numpy as np
 import smtplib
-from datetime import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from sqlalchemy import func, literal, or_, select, tuple_
 
 # --- MVC IMPORTS ---
-from models import db, User, Entry
+from models import db, init_storage, User, Entry, PatientLatest
+from counters import (
+    count_user,
+    discount_user_entries,
+    read_counters,
+    rebuild_counters,
+)
+from exports import RAW_COLUMNS, csv_chunks, parquet_available, parquet_chunks
+from ingest import WriteBehindQueue, write_entries
+from latest import ensure_latest, forget_latest, projection_row, rebuild_latest
+from medical_ai import ai_metrics, ask_medical_ai, stream_medical_ai
+from migrate import upgrade_schema
+from pubsub import PubSubHub
+from recent import RecentVitals
+from registry import ModelRegistry, LiveModels, ACTIVE, SHADOW, valid_version
+from seed import SCENARIOS, DEFAULT_MIX, seed_ward
+from triage import triage_batch, triage_reading, STATUS_LABELS, ADVICE_TEXT, CRITICAL
 
 # FIXED: Imported generate_excel_report instead of the old CSV one
-from utils import generate_pdf_report, generate_excel_report, ask_medical_ai
+from utils import (
+    generate_pdf_report,
+    generate_excel_report,
+    forget_pdf_reports,
+    pdf_bundle_chunks,
+)
 
 app = Flask(__name__)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///vitalmine.db"
+app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
+    "VITALMINE_DATABASE_URI", "sqlite:///vitalmine.db"
+)
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["SECRET_KEY"] = "secret_key_vitalmine_2026"
+app.config["MAX_BATCH_READINGS"] = 5000
+app.config["EXPORT_CHUNK_ROWS"] = 5000
+app.config["EXPORT_PARQUET_ROW_GROUP"] = 50_000
+app.config["PDF_CACHE_DIR"] = os.getenv(
+    "VITALMINE_PDF_CACHE", os.path.join(app.instance_path, "pdf_cache")
+)
+app.config["PDF_BUNDLE_WORKERS"] = None  # one per core
+
+# WAL + separate reader/writer pools for SQLite (see models.init_storage)
+app.config["SQLITE_TUNED"] = os.getenv("VITALMINE_SQLITE_TUNED", "1") != "0"
+init_storage(app)
+
+# Optional write-behind ingestion: readings are acknowledged once queued and
+# committed in groups by a background writer (see ingest.py)
+app.config["WRITE_BEHIND"] = os.getenv("VITALMINE_WRITE_BEHIND", "0") == "1"
+app.config["WRITE_BEHIND_BATCH_SIZE"] = 500
+app.config["WRITE_BEHIND_FLUSH_INTERVAL"] = 0.05
+app.config["WRITE_BEHIND_MAX_QUEUE"] = 10000
+
+# Live telemetry: committed readings are pushed to open SSE streams
+app.config["STREAM_KEEPALIVE_SECONDS"] = 15
+telemetry_hub = PubSubHub()
+
+# Last readings per patient held in memory for the history API (see recent.py)
+app.config["RECENT_VITALS_CAPACITY"] = 20
+app.config["RECENT_VITALS_MAX_PATIENTS"] = 5000
+recent_vitals = RecentVitals(
+    capacity=app.config["RECENT_VITALS_CAPACITY"],
+    max_patients=app.config["RECENT_VITALS_MAX_PATIENTS"],
+)
+
+
+def reading_event(row):
+    return {
+        "id": row["entry_id"],
+        "time": row["timestamp"].strftime("%H:%M:%S"),
+        "hr": row["hr"],
+        "temp": row["temp"],
+        "rr": row["rr"],
+        "sys_bp": row["sys_bp"],
+        "dia_bp": row["dia_bp"],
+        "status": row["status"],
+    }
+
+
+def publish_readings(rows):
+    recent_vitals.append(rows)
+    for row in rows:
+        if row.get("user_id") is not None:
+            telemetry_hub.publish(row["user_id"], reading_event(row))
 
-db.init_app(app)
+
+write_behind = None
+if app.config["WRITE_BEHIND"]:
+    write_behind = WriteBehindQueue(
+        app,
+        batch_size=app.config["WRITE_BEHIND_BATCH_SIZE"],
+        flush_interval=app.config["WRITE_BEHIND_FLUSH_INTERVAL"],
+        max_queue=app.config["WRITE_BEHIND_MAX_QUEUE"],
+        on_commit=publish_readings,
+    )
 
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "login"
 
-try:
-    model = joblib.load("sirs_model.pkl")
-except:
-    model = None
+# AI Risk Engine: versioned models compiled down to their coefficients (see
+# registry.py and scorer.py). Until a version is activated, sirs_model.pkl.
+# The model is loaded by the first reading scored, not at import: unpickling
+# sirs_model.pkl pulls in sklearn. Set VITALMINE_PRELOAD_MODEL=1 to load it
+# up front instead (e.g. before a pre-forking server forks its workers). Not
+# in PDF workers: under `python app.py` they re-import this file as __mp_main__.
+app.config["MODEL_REGISTRY_DIR"] = os.getenv(
+    "VITALMINE_MODEL_REGISTRY", os.path.join(app.instance_path, "model_registry")
+)
+app.config["MODEL_RELOAD_CHECK_SECONDS"] = 2
+app.config["SHADOW_QUEUE_SIZE"] = 10000
+app.config["PRELOAD_MODEL"] = os.getenv("VITALMINE_PRELOAD_MODEL", "0") == "1"
+model_registry = ModelRegistry(app.config["MODEL_REGISTRY_DIR"])
+live_model = LiveModels(
+    model_registry,
+    fallback_path="sirs_model.pkl",
+    check_interval=app.config["MODEL_RELOAD_CHECK_SECONDS"],
+    queue_size=app.config["SHADOW_QUEUE_SIZE"],
+)
+if app.config["PRELOAD_MODEL"] and __name__ != "__mp_main__":
+    live_model.reload()
 
 
 @login_manager.user_loader
@@ -43,6 +161,19 @@ def load_user(user_id):
     return db.session.get(User, int(user_id))
 
 
+def store_entries(rows):
+    """
+    Hands readings to the write-behind queue when enabled, otherwise (or if
+    the queue is full) commits them here. Returns True if they were queued.
+    """
+    if write_behind and write_behind.submit(rows):
+        return True
+    write_entries(rows)
+    db.session.commit()
+    publish_readings(rows)
+    return False
+
+
 # --- NOTIFICATION SERVICE ---
 def send_emergency_alert(patient_name, vitals, status):
     print("\n" + "=" * 50)
@@ -66,46 +197,173 @@ def home():
     if current_user.role == "patient":
         return redirect(url_for("patient_dashboard"))
 
-    patients = User.query.filter_by(role="patient").all()
+    # Most recently active patients first, so the twin opens on live data
+    ensure_latest()
+    patients = (
+        User.query.filter_by(role="patient")
+        .outerjoin(PatientLatest, PatientLatest.user_id == User.id)
+        .order_by(PatientLatest.timestamp.desc().nulls_last(), User.id)
+        .all()
+    )
 
-    all_entries = Entry.query.order_by(Entry.timestamp.desc()).all()
+    # KPI cards read the running totals kept by counters.py
+    counts = read_counters()
+    total_entries = counts["entries_total"]
     stats = {
-        "total": len(all_entries),
-        "high": sum(1 for e in all_entries if e.status in ["High", "Critical"]),
-        "stable": sum(1 for e in all_entries if e.status not in ["High", "Critical"]),
+        "total": total_entries,
+        "high": counts["entries_high"],
+        "stable": total_entries - counts["entries_high"],
     }
 
     admin_stats = {}
     if current_user.role == "admin":
-        all_users = User.query.all()
         admin_stats = {
-            "total_users": len(all_users),
-            "staff_count": sum(1 for u in all_users if u.role in ["doctor", "nurse"]),
-            "patient_count": sum(1 for u in all_users if u.role == "patient"),
+            "total_users": counts["users_total"],
+            "staff_count": counts["users_staff"],
+            "patient_count": counts["users_patient"],
         }
 
-    history_data = []
-    for e in all_entries:
-        history_data.append(
-            {
-                "id": e.id,
-                "time": e.timestamp.strftime("%H:%M:%S"),
-                "name": e.name,
-                "vitals": f"T:{e.temp} / HR:{e.hr} / RR:{e.rr} / BP:{e.sys_bp}/{e.dia_bp}",
-                "status": e.status,
-                "advice": e.advice,
-            }
-        )
+    # Only the first page of the feed ships with the page; DataTables
+    # fetches the rest from /api/ward_history.
+    history_data, next_cursor = query_ward_history(limit=HISTORY_PAGE_SIZE)
 
     return render_template(
         "home.html",
         history=history_data,
+        history_total=total_entries,
+        history_cursor=next_cursor,
+        history_page_size=HISTORY_PAGE_SIZE,
         stats=stats,
         patients=patients,
         admin_stats=admin_stats,
     )
 
 
+# --- WARD HISTORY FEED (SERVER-SIDE DATATABLES) ---
+HISTORY_PAGE_SIZE = 10
+HISTORY_MAX_PAGE_SIZE = 100
+
+# DataTables column index -> sortable Entry column
+HISTORY_SORT_COLUMNS = {0: Entry.timestamp, 1: Entry.name, 3: Entry.status}
+
+
+def history_row(e):
+    return {
+        "id": e.id,
+        "time": e.timestamp.strftime("%H:%M:%S"),
+        "name": e.name,
+        "vitals": f"T:{e.temp} / HR:{e.hr} / RR:{e.rr} / BP:{e.sys_bp}/{e.dia_bp}",
+        "status": e.status,
+        "advice": e.advice,
+    }
+
+
+def history_search_filter(search):
+    pattern = f"%{search}%"
+    return or_(Entry.name.like(pattern), Entry.status.like(pattern))
+
+
+def encode_cursor(sort_col, e):
+    value = getattr(e, sort_col.key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return json.dumps([value, e.id])
+
+
+def decode_cursor(sort_col, cursor):
+    value, entry_id = json.loads(cursor)
+    if sort_col is Entry.timestamp:
+        value = datetime.fromisoformat(value)
+    return value, int(entry_id)
+
+
+def query_ward_history(
+    search="", sort_col=Entry.timestamp, descending=True, after=None, offset=0, limit=10
+):
+    """
+    Fetches one page of the ward feed. With an `after` cursor (the sort key
+    of the previous page's last row) the page is found by keyset seek on
+    (sort column, id); without one it falls back to OFFSET.
+    Returns (rows, next_cursor).
+    """
+    query = Entry.query
+    if search:
+        query = query.filter(history_search_filter(search))
+
+    key = tuple_(sort_col, Entry.id)
+    if after:
+        value, entry_id = decode_cursor(sort_col, after)
+        bound = tuple_(literal(value, sort_col.type), literal(entry_id))
+        query = query.filter(key < bound if descending else key > bound)
+
+    if descending:
+        query = query.order_by(sort_col.desc(), Entry.id.desc())
+    else:
+        query = query.order_by(sort_col.asc(), Entry.id.asc())
+    if offset and not after:
+        query = query.offset(offset)
+
+    entries = query.limit(limit).all()
+    next_cursor = (
+        encode_cursor(sort_col, entries[-1]) if len(entries) == limit else None
+    )
+    return [history_row(e) for e in entries], next_cursor
+
+
+@app.route("/api/ward_history")
+@login_required
+def ward_history_api():
+    if current_user.role == "patient":
+        return jsonify({"error": "Access Denied"}), 403
+
+    args = request.args
+    try:
+        draw = int(args.get("draw", 1))
+        start = max(int(args.get("start", 0)), 0)
+        length = int(args.get("length", HISTORY_PAGE_SIZE))
+        sort_index = int(args.get("order[0][column]", 0))
+    except ValueError:
+        return jsonify({"error": "Invalid paging parameters"}), 400
+
+    if length <= 0 or length > HISTORY_MAX_PAGE_SIZE:
+        length = HISTORY_PAGE_SIZE
+    sort_col = HISTORY_SORT_COLUMNS.get(sort_index, Entry.timestamp)
+    descending = args.get("order[0][dir]", "desc") != "asc"
+    search = args.get("search[value]", "").strip()
+
+    try:
+        rows, next_cursor = query_ward_history(
+            search=search,
+            sort_col=sort_col,
+            descending=descending,
+            after=args.get("after") or None,
+            offset=start,
+            limit=length,
+        )
+    except (ValueError, TypeError):
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    total = read_counters()["entries_total"]
+    if search:
+        filtered = (
+            db.session.query(func.count(Entry.id))
+            .filter(history_search_filter(search))
+            .scalar()
+        )
+    else:
+        filtered = total
+
+    return jsonify(
+        {
+            "draw": draw,
+            "recordsTotal": total,
+            "recordsFiltered": filtered,
+            "data": rows,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
 @app.route("/patient_dashboard")
 @login_required
 def patient_dashboard():
@@ -131,12 +389,15 @@ def patient_dashboard():
 def patients_directory():
     if current_user.role == "patient":
         return redirect(url_for("patient_dashboard"))
-    patients = User.query.filter_by(role="patient").all()
+    ensure_latest()
+    patients = (
+        db.session.query(User, PatientLatest)
+        .outerjoin(PatientLatest, PatientLatest.user_id == User.id)
+        .filter(User.role == "patient")
+        .all()
+    )
     patient_list = []
-    for p in patients:
-        last_entry = (
-            Entry.query.filter_by(user_id=p.id).order_by(Entry.timestamp.desc()).first()
-        )
+    for p, last_entry in patients:
         status = last_entry.status if last_entry else "No Data"
         last_seen = last_entry.timestamp.strftime("%Y-%m-%d") if last_entry else "Never"
         patient_list.append(
@@ -172,6 +433,77 @@ def patient_file(patient_id):
     return render_template("patient_file.html", patient=patient, history=history)
 
 
+PDF_BUNDLE_COLUMNS = (
+    Entry.id,
+    Entry.user_id,
+    Entry.name,
+    Entry.temp,
+    Entry.hr,
+    Entry.rr,
+    Entry.sys_bp,
+    Entry.dia_bp,
+    Entry.status,
+    Entry.advice,
+    Entry.timestamp,
+)
+pdf_executor = None
+
+
+def get_pdf_executor():
+    """
+    Process pool for PDF rendering, started on first use (one worker per core).
+    Workers are not forked from this process: it runs write-behind, shadow
+    scoring and AI threads and holds SQLite connections, and a fork could copy
+    a lock mid-hold. They come from a fork server (spawned where there is
+    none, e.g. Windows). Either way a worker re-imports the main script, so
+    under `python app.py` it imports this module as __mp_main__: that only
+    sets up unconnected engines and idle objects, as threads start on first
+    use and the model preload is skipped there.
+    """
+    global pdf_executor
+    if pdf_executor is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["utils", "pdf_report"])
+        else:
+            context = multiprocessing.get_context("spawn")
+        pdf_executor = ProcessPoolExecutor(
+            max_workers=app.config["PDF_BUNDLE_WORKERS"], mp_context=context
+        )
+    return pdf_executor
+
+
+@app.route("/patient_file/<int:patient_id>/pdf_bundle")
+@login_required
+def patient_pdf_bundle(patient_id):
+    if current_user.role not in ["doctor", "nurse", "admin"]:
+        flash("Access Denied.", "danger")
+        return redirect(url_for("home"))
+
+    patient = db.session.get(User, patient_id)
+    if not patient or patient.role != "patient":
+        return "Patient not found", 404
+
+    # Plain objects rather than ORM instances so they can be sent to workers
+    entries = [
+        SimpleNamespace(**row._asdict())
+        for row in db.session.execute(
+            select(*PDF_BUNDLE_COLUMNS)
+            .where(Entry.user_id == patient_id)
+            .order_by(Entry.timestamp.desc())
+        )
+    ]
+    return Response(
+        pdf_bundle_chunks(entries, app.config["PDF_CACHE_DIR"], get_pdf_executor()),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=EHR_{patient.username}_reports.zip"
+            )
+        },
+    )
+
+
 @app.route("/register", methods=["GET", "POST"])
 def register():
     if current_user.is_authenticated and current_user.role not in ["admin", "nurse"]:
@@ -227,6 +559,7 @@ def register():
             department=department,
         )
         db.session.add(new_user)
+        count_user(role)
         db.session.commit()
 
         if current_user.is_authenticated and current_user.role == "nurse":
@@ -270,7 +603,7 @@ def add_vitals():
         return "Access Denied"
 
     try:
-        temp = float(request.form.get("temperature"))
+        temp = reading_float(request.form.get("temperature"))
         hr = int(request.form.get("heart_rate"))
 
         rr_raw = request.form.get("resp_rate")
@@ -299,106 +632,212 @@ def add_vitals():
 
     # AI Risk Engine
     ai_risk = "Stable"
-    if model:
-        df = pd.DataFrame([[temp, hr, rr, 8000.0]], columns=["temp", "hr", "rr", "wbc"])
-        if model.predict(df)[0] == 1:
-            ai_risk = "High"
-
-    # --- CLINICAL ALGORITHM OVERHAUL ---
-    is_hypotensive = sys_bp <= 90 or dia_bp <= 60
-    is_hypertensive_crisis = sys_bp >= 180 or dia_bp >= 120
-    is_severe_bradycardia = hr <= 40
-    is_severe_tachypnea = rr >= 30
-    is_severe_bradypnea = rr <= 8
-    is_severe_hypothermia = temp <= 35.0
-
-    if (
-        hr >= 130
-        or is_severe_bradycardia
-        or temp >= 39.5
-        or is_severe_hypothermia
-        or is_hypotensive
-        or is_hypertensive_crisis
-        or is_severe_tachypnea
-        or is_severe_bradypnea
-    ):
-        status = "Critical"
-        if is_hypotensive:
-            advice_text = "CRITICAL: Severe Hypotension (Shock). Seek immediate care."
-        elif is_severe_bradycardia:
-            advice_text = "CRITICAL: Severe Bradycardia. High risk of cardiac arrest."
-        elif is_severe_tachypnea or is_severe_bradypnea:
-            advice_text = "CRITICAL: Respiratory failure detected. Intubation risk."
-        else:
-            advice_text = "CRITICAL: Severe vitals detected. Code Blue parameters met."
+    model = live_model.scorer()
+    if model and model.predict_one(temp, hr, rr, sys_bp, dia_bp) == 1:
+        ai_risk = "High"
+    live_model.shadow(temp, hr, rr, sys_bp, dia_bp, ai_risk == "High")
+
+    # --- CLINICAL ALGORITHM (see triage.py) ---
+    status, advice_text = triage_reading(
+        temp, hr, rr, sys_bp, dia_bp, ai_high=ai_risk == "High"
+    )
 
+    if status == "Critical":
         flash(f"🚨 EMERGENCY PROTOCOL: Alert sent for {patient_name}.", "danger")
         send_emergency_alert(
             patient_name,
             {"temp": temp, "hr": hr, "sys_bp": sys_bp, "dia_bp": dia_bp},
             status,
         )
-
-    elif (
-        ai_risk == "High"
-        or sys_bp >= 140
-        or dia_bp >= 90
-        or temp >= 38.1
-        or temp < 36.0
-        or hr > 100
-        or hr < 60
-        or rr > 20
-        or rr < 12
-    ):
-        status = "Warning"
-        advice_text = "Warning: Abnormal vitals detected. Monitor closely."
-
-        if ai_risk == "High":
-            advice_text = "AI Warning: Model indicates early SIRS/Sepsis trajectory."
-        elif hr < 60:
-            advice_text = "Bradycardia detected. Monitor heart rate."
-        elif rr > 20 or rr < 12:
-            advice_text = "Abnormal respiratory rate. Assess airway."
-        elif sys_bp >= 140 or dia_bp >= 90:
-            advice_text = "Hypertension detected. Monitor blood pressure."
-        elif temp >= 38.1 or temp < 36.0:
-            advice_text = "Abnormal body temperature detected."
-        elif hr > 100:
-            advice_text = "Tachycardia. Rest and re-check."
-
+    elif status == "Warning":
         flash(f"⚠️ Warning Alert for {patient_name}. Monitor vitals.", "warning")
-
     else:
-        status = "Stable"
-        advice_text = "Vitals are normal. Continue standard care."
         flash(f"✅ Vitals logged for {patient_name}.", "success")
 
-    new_entry = Entry(
-        user_id=user_id_save,
-        name=patient_name,
-        temp=temp,
-        hr=hr,
-        rr=rr,
-        sys_bp=sys_bp,
-        dia_bp=dia_bp,
-        status=status,
-        advice=advice_text,
+    store_entries(
+        [
+            {
+                "user_id": user_id_save,
+                "name": patient_name,
+                "temp": temp,
+                "hr": hr,
+                "rr": rr,
+                "sys_bp": sys_bp,
+                "dia_bp": dia_bp,
+                "status": status,
+                "advice": advice_text,
+            }
+        ]
     )
-    db.session.add(new_entry)
-    db.session.commit()
 
     return redirect(
         url_for("patient_dashboard" if current_user.role == "patient" else "home")
     )
 
 
+# --- BULK INGESTION (WEARABLES) ---
+def parse_batch_readings():
+    """
+    Reads the body of a batch upload. Accepts a JSON array, a JSON object
+    with a "readings" array, or NDJSON (one reading per line).
+    """
+    if request.mimetype in ["application/x-ndjson", "application/jsonl"]:
+        lines = request.get_data(as_text=True).splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+
+    # silent: malformed JSON comes back as None and is rejected below
+    payload = request.get_json(force=True, silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get("readings")
+    if not isinstance(payload, list):
+        raise ValueError("Expected an array of readings.")
+    return payload
+
+
+def reading_int(value, default=None):
+    """
+    int() for one JSON field, as strict as the form path: a missing or empty
+    value takes the default, but 0 stays 0 and 80.5 is rejected, not truncated.
+    """
+    if (value is None or value == "") and default is not None:
+        return default
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"Not a whole number: {value!r}")
+    value = int(value)
+    # The recent-vitals ring buffers hold vitals as int32
+    if not -(2**31) <= value < 2**31:
+        raise ValueError(f"Out of range: {value!r}")
+    return value
+
+
+def reading_float(value):
+    """
+    float() for one reading field, form or JSON. float() and Python's JSON
+    parser both accept NaN and Infinity, and float(True) is 1.0; none of them
+    is a reading.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Not a number: {value!r}")
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"Not a finite number: {value!r}")
+    return value
+
+
+@app.route("/api/vitals/batch", methods=["POST"])
+@login_required
+def add_vitals_batch():
+    if current_user.role == "doctor":
+        return jsonify({"error": "Access Denied"}), 403
+
+    try:
+        readings = parse_batch_readings()
+    except ValueError as e:
+        return jsonify({"error": f"Malformed batch: {e}"}), 400
+
+    if len(readings) > app.config["MAX_BATCH_READINGS"]:
+        return (
+            jsonify(
+                {"error": f"Batch exceeds {app.config['MAX_BATCH_READINGS']} readings."}
+            ),
+            413,
+        )
+
+    # Same field names and defaults as the /add_vitals form
+    results = [None] * len(readings)
+    valid = []
+    for i, raw in enumerate(readings):
+        try:
+            valid.append(
+                (
+                    i,
+                    (
+                        current_user.username
+                        if current_user.role == "patient"
+                        else raw.get("name")
+                    ),
+                    reading_float(raw.get("temperature")),
+                    reading_int(raw.get("heart_rate")),
+                    reading_int(raw.get("resp_rate"), 18),
+                    reading_int(raw.get("sys_bp"), 120),
+                    reading_int(raw.get("dia_bp"), 80),
+                )
+            )
+        except (ValueError, TypeError, AttributeError):
+            results[i] = {"ok": False, "error": "Invalid vitals"}
+
+    if valid:
+        rows, names, temp, hr, rr, sys_bp, dia_bp = zip(*valid)
+
+        # One lookup for every patient in the batch
+        if current_user.role == "patient":
+            patient_ids = {current_user.username: current_user.id}
+        else:
+            patient_ids = dict(
+                db.session.query(User.username, User.id).filter(
+                    User.username.in_(set(names)), User.role == "patient"
+                )
+            )
+
+        ai_high = None
+        model = live_model.scorer()
+        if model:
+            ai_high = model.predict_batch(temp, hr, rr, sys_bp, dia_bp) == 1
+        live_model.shadow(
+            temp,
+            hr,
+            rr,
+            sys_bp,
+            dia_bp,
+            ai_high if ai_high is not None else np.zeros(len(temp), dtype=bool),
+        )
+
+        status_codes, advice_codes = triage_batch(temp, hr, rr, sys_bp, dia_bp, ai_high)
+
+        new_entries = []
+        for n, i in enumerate(rows):
+            status = STATUS_LABELS[status_codes[n]]
+            new_entries.append(
+                {
+                    "user_id": patient_ids.get(names[n]),
+                    "name": names[n],
+                    "temp": temp[n],
+                    "hr": hr[n],
+                    "rr": rr[n],
+                    "sys_bp": sys_bp[n],
+                    "dia_bp": dia_bp[n],
+                    "status": status,
+                    "advice": ADVICE_TEXT[advice_codes[n]],
+                }
+            )
+            results[i] = {"ok": True, "status": status}
+
+        # Alerts go out before the write, even when it is deferred
+        for n in np.flatnonzero(status_codes == CRITICAL):
+            send_emergency_alert(names[n], new_entries[n], "Critical")
+
+        # Single transaction for the whole batch
+        queued = store_entries(new_entries)
+    else:
+        queued = False
+
+    return jsonify(
+        {
+            "queued": queued,
+            "accepted": len(valid),
+            "rejected": len(readings) - len(valid),
+            "results": results,
+        }
+    )
+
+
 @app.route("/generate_pdf/<int:entry_id>")
 @login_required
 def generate_pdf(entry_id):
     entry = db.session.get(Entry, entry_id)
     if not entry:
         return "Not Found", 404
-    return generate_pdf_report(entry)
+    return generate_pdf_report(entry, cache_dir=app.config["PDF_CACHE_DIR"])
 
 
 # FIXED: Call the correct Excel generation function
@@ -407,20 +846,133 @@ def generate_pdf(entry_id):
 def export_data():
     if current_user.role in ["nurse", "patient"]:
         return "Access Denied"
-    return generate_excel_report(Entry.query.order_by(Entry.timestamp.desc()).all())
+    try:
+        rows = export_rows(request.args)
+    except ValueError:
+        return jsonify({"error": "Invalid export filters"}), 400
+    return generate_excel_report(rows)
+
+
+EXPORT_COLUMNS = (
+    Entry.id,
+    Entry.timestamp,
+    Entry.name,
+    Entry.temp,
+    Entry.hr,
+    Entry.rr,
+    Entry.sys_bp,
+    Entry.dia_bp,
+    Entry.status,
+    Entry.advice,
+)
+
+
+def export_rows(args, columns=EXPORT_COLUMNS, newest_first=True):
+    """
+    Streams the export rows, fetched from the database in chunks. Optional
+    filters: from / to (YYYY-MM-DD, inclusive) and patient_id. Raises
+    ValueError on a malformed filter.
+    """
+    query = select(*columns)
+    if args.get("from"):
+        start = datetime.strptime(args["from"], "%Y-%m-%d")
+        query = query.where(Entry.timestamp >= start)
+    if args.get("to"):
+        end = datetime.strptime(args["to"], "%Y-%m-%d") + timedelta(days=1)
+        query = query.where(Entry.timestamp < end)
+    if args.get("patient_id"):
+        query = query.where(Entry.user_id == int(args["patient_id"]))
+    order = Entry.timestamp.desc() if newest_first else Entry.timestamp.asc()
+    query = query.order_by(order, Entry.id).execution_options(
+        yield_per=app.config["EXPORT_CHUNK_ROWS"]
+    )
+    return db.session.execute(query)
+
+
+# Raw Entry dumps for analytics, oldest first, streamed while the query runs
+RAW_EXPORT_COLUMNS = tuple(getattr(Entry, name) for name in RAW_COLUMNS)
+
+
+def raw_export(args, chunks, mimetype, extension):
+    if current_user.role in ["nurse", "patient"]:
+        return "Access Denied"
+    try:
+        rows = export_rows(args, columns=RAW_EXPORT_COLUMNS, newest_first=False)
+    except ValueError:
+        return jsonify({"error": "Invalid export filters"}), 400
+    return Response(
+        stream_with_context(chunks(rows)),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=vitalmine_entries.{extension}"
+        },
+    )
+
+
+@app.route("/export_data.csv")
+@login_required
+def export_data_csv():
+    return raw_export(
+        request.args,
+        lambda rows: csv_chunks(rows, app.config["EXPORT_CHUNK_ROWS"]),
+        "text/csv",
+        "csv",
+    )
+
+
+@app.route("/export_data.parquet")
+@login_required
+def export_data_parquet():
+    if not parquet_available():
+        return jsonify({"error": "Parquet export requires pyarrow"}), 501
+    return raw_export(
+        request.args,
+        lambda rows: parquet_chunks(rows, app.config["EXPORT_PARQUET_ROW_GROUP"]),
+        "application/vnd.apache.parquet",
+        "parquet",
+    )
 
 
 @app.route("/chat_with_ai", methods=["POST"])
 @login_required
 def chat_with_ai():
     user_question = request.json.get("question")
+    ai_response = ask_medical_ai(user_question, chat_context())
+    return {"response": ai_response}
 
-    last_entry = (
-        Entry.query.filter_by(user_id=current_user.id)
-        .order_by(Entry.timestamp.desc())
-        .first()
+
+@app.route("/chat_with_ai/stream", methods=["POST"])
+@login_required
+def chat_with_ai_stream():
+    """
+    Streams VitalBot's answer as Server-Sent Events while it is generated:
+    "token" events carry text, and a final "done" event carries the
+    time-to-first-token and total time in milliseconds.
+    """
+    user_question = request.json.get("question")
+    answer = stream_medical_ai(user_question, chat_context())
+
+    def events():
+        for piece in answer:
+            yield f"event: token\ndata: {json.dumps({'text': piece})}\n\n"
+        timings = {
+            "ttft_ms": round((answer.first_token or answer.elapsed) * 1e3, 1),
+            "total_ms": round(answer.elapsed * 1e3, 1),
+        }
+        yield f"event: done\ndata: {json.dumps(timings)}\n\n"
+
+    return Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+
+def chat_context():
+    """The current patient's latest vitals, as VitalBot's context."""
+    ensure_latest()
+    last_entry = db.session.get(PatientLatest, current_user.id)
+
     if last_entry:
         context = {
             "name": current_user.username,
@@ -441,43 +993,166 @@ def chat_with_ai():
             "dia_bp": "N/A",
             "status": "Unknown",
         }
+    return context
 
-    ai_response = ask_medical_ai(user_question, context)
-    return {"response": ai_response}
+
+@app.route("/api/ai/metrics")
+@login_required
+def ai_metrics_api():
+    if current_user.role not in ["admin", "doctor"]:
+        return jsonify({"error": "Access Denied"}), 403
+    return jsonify(ai_metrics())
+
+
+# --- AI MODEL REGISTRY (ADMIN) ---
+def model_registry_status():
+    live_model.ensure_loaded()  # nothing may have been scored yet
+    return dict(live_model.status(), versions=model_registry.versions())
+
+
+@app.route("/api/models")
+@login_required
+def models_api():
+    if current_user.role != "admin":
+        return jsonify({"error": "Access Denied"}), 403
+    return jsonify(model_registry_status())
+
+
+@app.route("/api/models/<pointer>", methods=["POST"])
+@login_required
+def set_model_pointer(pointer):
+    """Activates or shadows a version, then swaps it in without a restart."""
+    if current_user.role != "admin":
+        return jsonify({"error": "Access Denied"}), 403
+    names = {"activate": ACTIVE, "shadow": SHADOW}
+    if pointer not in names:
+        return jsonify({"error": "Unknown action"}), 404
+
+    payload = request.get_json(silent=True)
+    version = payload.get("version") if isinstance(payload, dict) else None
+    if version is None and pointer == "activate":
+        return jsonify({"error": "A version is required."}), 400
+    if version is not None and not valid_version(version):
+        return jsonify({"error": "Invalid model version."}), 400
+    try:
+        model_registry.set_pointer(names[pointer], version)
+    except KeyError:
+        return jsonify({"error": f"Unknown model version: {version}"}), 404
+    live_model.reload()
+    return jsonify(model_registry_status())
+
+
+@app.route("/api/models/reload", methods=["POST"])
+@login_required
+def reload_models():
+    if current_user.role != "admin":
+        return jsonify({"error": "Access Denied"}), 403
+    live_model.reload()
+    return jsonify(model_registry_status())
+
+
+def patient_version(user_id, readings):
+    """
+    Strong validator for a patient's telemetry: the id and timestamp of the
+    newest of their recent readings.
+    """
+    if not len(readings):
+        return f"patient-{user_id}-0"
+    newest = readings[-1]
+    return f"patient-{user_id}-{newest['id']}-{newest['ts']}"
+
+
+def conditional_json(etag, build):
+    """
+    Answers 304 when the client already holds `etag`; otherwise calls build()
+    for the JSON body. Clients must revalidate before reusing a cached copy.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 
 @app.route("/api/patient_history/<int:user_id>")
 @login_required
 def get_patient_history(user_id):
-    entries = (
-        Entry.query.filter_by(user_id=user_id)
-        .order_by(Entry.timestamp.desc())
-        .limit(20)
-        .all()
+    ensure_latest()
+    readings = recent_vitals.get(user_id)
+    return conditional_json(
+        patient_version(user_id, readings),
+        lambda: patient_history_payload(recent_vitals.vitals(readings)),
     )
-    entries = entries[::-1]
 
+
+def patient_history_payload(entries):
     if not entries:
-        return jsonify({"error": "No data"})
+        return {"error": "No data"}
 
     latest = entries[-1]
 
-    return jsonify(
-        {
-            "timestamps": [e.timestamp.strftime("%H:%M:%S") for e in entries],
-            "heart_rates": [e.hr for e in entries],
-            "temps": [e.temp for e in entries],
-            "respiration_rates": [e.rr for e in entries],
-            "latest_vitals": {
-                "hr": latest.hr,
-                "temp": latest.temp,
-                "rr": latest.rr,
-                "sys_bp": latest.sys_bp,
-                "dia_bp": latest.dia_bp,
-                "status": latest.status,
-            },
-        }
+    return {
+        "timestamps": [e["timestamp"].strftime("%H:%M:%S") for e in entries],
+        "heart_rates": [e["hr"] for e in entries],
+        "temps": [e["temp"] for e in entries],
+        "respiration_rates": [e["rr"] for e in entries],
+        "latest_vitals": {
+            "hr": latest["hr"],
+            "temp": latest["temp"],
+            "rr": latest["rr"],
+            "sys_bp": latest["sys_bp"],
+            "dia_bp": latest["dia_bp"],
+            "status": latest["status"],
+        },
+    }
+
+
+@app.route("/api/stream/patient/<int:user_id>")
+@login_required
+def stream_patient(user_id):
+    """
+    Server-Sent Events feed of a patient's new readings as they commit. A
+    reconnecting browser sends Last-Event-ID and gets anything it missed.
+    """
+    subscription = telemetry_hub.subscribe(user_id)
+
+    missed = []
+    last_id = request.headers.get("Last-Event-ID", type=int)
+    if last_id is not None:
+        missed = [
+            reading_event(projection_row(e))
+            for e in Entry.query.filter(Entry.user_id == user_id, Entry.id > last_id)
+            .order_by(Entry.id)
+            .limit(20)
+        ]
+    keepalive = app.config["STREAM_KEEPALIVE_SECONDS"]
+
+    # The generator runs after this view returns, so it must not touch the
+    # database session or current_user.
+    def events():
+        yield "retry: 5000\n\n"
+        for message in missed:
+            yield sse_message(message)
+        while True:
+            try:
+                yield sse_message(subscription.get(timeout=keepalive))
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+
+    response = Response(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+    response.call_on_close(subscription.close)
+    return response
+
+
+def sse_message(message):
+    return f"id: {message['id']}\nevent: reading\ndata: {json.dumps(message)}\n\n"
 
 
 # --- USER MANAGEMENT HUB (ADMIN ONLY) ---
@@ -509,6 +1184,7 @@ def edit_user(user_id):
         return redirect(url_for("staff_directory"))
 
     new_username = request.form.get("username")
+    renamed = bool(new_username) and new_username != user_to_edit.username
     if new_username:
         existing_user = User.query.filter_by(username=new_username).first()
         if existing_user and existing_user.id != user_id:
@@ -531,6 +1207,9 @@ def edit_user(user_id):
         user_to_edit.contact = request.form.get("contact")
 
     db.session.commit()
+    if renamed:
+        # Cached reports print the old name; don't leave them on disk
+        forget_pdf_reports(app.config["PDF_CACHE_DIR"], user_id)
     flash(
         f"User profile for '{user_to_edit.username}' has been successfully updated.",
         "success",
@@ -552,9 +1231,14 @@ def delete_user(user_id):
                 "System Protection: You cannot delete your own admin account.", "danger"
             )
         else:
+            discount_user_entries(user_id)
+            forget_latest(user_id)
             Entry.query.filter_by(user_id=user_id).delete()
+            count_user(user_to_delete.role, sign=-1)
             db.session.delete(user_to_delete)
             db.session.commit()
+            recent_vitals.forget(user_id)
+            forget_pdf_reports(app.config["PDF_CACHE_DIR"], user_id)
             flash(
                 f"User '{user_to_delete.username}' and all associated records have been permanently deleted.",
                 "success",
@@ -563,6 +1247,167 @@ def delete_user(user_id):
     return redirect(url_for("staff_directory"))
 
 
+# --- MAINTENANCE COMMANDS ---
+@app.cli.command("upgrade-db")
+def upgrade_db_command():
+    """Adds missing tables and indexes to an existing database."""
+    created = upgrade_schema()
+    print(f"Created indexes: {', '.join(created)}" if created else "Schema is current.")
+
+
+@app.cli.command("rebuild-counters")
+def rebuild_counters_command():
+    """Recomputes the KPI counters from the Entry and User tables."""
+    for key, value in rebuild_counters().items():
+        print(f"{key}: {value}")
+
+
+@app.cli.command("rebuild-latest")
+def rebuild_latest_command():
+    """Recomputes every patient's latest-reading projection from Entry."""
+    print(f"Projected latest readings for {rebuild_latest()} patients.")
+
+
+@app.cli.command("seed")
+@click.option("--patients", default=1000, show_default=True)
+@click.option("--readings", default=100, show_default=True, help="Per patient.")
+@click.option("--days", default=30, show_default=True, help="Span of the readings.")
+@click.option(
+    "--mix",
+    default=",".join(str(w) for w in DEFAULT_MIX),
+    show_default=True,
+    help=f"Scenario weights ({'/'.join(SCENARIOS)}).",
+)
+@click.option("--batch-size", default=50_000, show_default=True)
+@click.option("--random-seed", type=int, default=None)
+@click.option("--prefix", default="seed_patient_", show_default=True)
+@click.option("--password", default="password123", show_default=True)
+def seed_command(
+    patients, readings, days, mix, batch_size, random_seed, prefix, password
+):
+    """Bulk-loads synthetic patients and vitals for capacity testing."""
+    weights = [float(w) for w in mix.split(",")]
+    if len(weights) != len(SCENARIOS):
+        raise click.BadParameter(
+            f"Expected {len(SCENARIOS)} weights.", param_hint="--mix"
+        )
+
+    upgrade_schema()
+    start = time.perf_counter()
+
+    def progress(done, total):
+        rate = done / (time.perf_counter() - start)
+        print(f"  {done:>10}/{total} readings ({rate * 60 / 1e6:.2f}M rows/min)")
+
+    total = seed_ward(
+        patients,
+        readings,
+        days=days,
+        mix=weights,
+        scorer=live_model.scorer(),
+        batch_size=batch_size,
+        random_seed=random_seed,
+        prefix=prefix,
+        password=password,
+        on_batch=progress,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Seeded {patients} patients and {total} readings in {elapsed:.1f}s.")
+
+
+@app.cli.command("train-model")
+@click.option("--chunk-rows", default=50_000, show_default=True)
+@click.option("--epochs", default=5, show_default=True)
+@click.option("--random-seed", default=0, show_default=True)
+@click.option(
+    "--deploy",
+    type=click.Choice(["none", "shadow", "active"]),
+    default="none",
+    show_default=True,
+    help="Also start using the new version.",
+)
+@click.option("--output", default=None, help="Also save a copy to this file.")
+def train_model_command(chunk_rows, epochs, random_seed, deploy, output):
+    """Retrains the AI risk model on every stored reading and publishes it."""
+    # pandas and sklearn are only needed here, not by the web app
+    import joblib
+    from training import entry_chunks, evaluate, fit_incremental
+
+    def chunks():
+        return entry_chunks(chunk_rows)
+
+    start = time.perf_counter()
+    pipeline, stats = fit_incremental(chunks, epochs=epochs, random_seed=random_seed)
+    print(
+        f"Trained on {stats['trained']} readings ({stats['positives']} positive) "
+        f"in {time.perf_counter() - start:.1f}s."
+    )
+
+    def describe(label, metrics):
+        print(
+            f"{label:9} holdout accuracy {metrics['accuracy']:.3f}  "
+            f"precision {metrics['precision']:.3f}  recall {metrics['recall']:.3f}"
+        )
+
+    describe("New:", stats["holdout"])
+    current = live_model.scorer()
+    if current:
+        describe("Current:", evaluate(current, chunks))
+
+    version = model_registry.publish(
+        pipeline,
+        trainer="training.fit_incremental",
+        epochs=epochs,
+        random_seed=random_seed,
+        **stats,
+    )
+    print(f"Published {version} to {model_registry.root}.")
+    if deploy != "none":
+        model_registry.set_pointer(ACTIVE if deploy == "active" else SHADOW, version)
+        print(f"{version} is now the {deploy} model; running servers pick it up.")
+    if output:
+        joblib.dump(pipeline, output)
+        print(f"Saved a copy to {output}.")
+
+
+@app.cli.command("model-list")
+def model_list_command():
+    """Lists the published AI model versions."""
+    pointers = {
+        model_registry.pointer(ACTIVE): "active",
+        model_registry.pointer(SHADOW): "shadow",
+    }
+    for meta in model_registry.versions():
+        holdout = meta.get("holdout", {})
+        print(
+            f"{meta['version']}  {meta['created']}  "
+            f"accuracy {holdout.get('accuracy', float('nan')):.3f}  "
+            f"{pointers.get(meta['version'], '')}"
+        )
+
+
+@app.cli.command("model-activate")
+@click.argument("version")
+def model_activate_command(version):
+    """Makes VERSION the model that serves predictions."""
+    try:
+        model_registry.set_pointer(ACTIVE, version)
+    except KeyError:
+        raise click.BadParameter(f"Unknown model version: {version}")
+    print(f"{version} is now active; running servers pick it up.")
+
+
+@app.cli.command("model-shadow")
+@click.argument("version")
+def model_shadow_command(version):
+    """Shadow-scores readings with VERSION ('none' to stop)."""
+    try:
+        model_registry.set_pointer(SHADOW, None if version == "none" else version)
+    except KeyError:
+        raise click.BadParameter(f"Unknown model version: {version}")
+    print(f"Shadow model: {version}")
+
+
 # --- PHASE 2 MODULE PLACEHOLDERS ---
 @app.route("/trends")
 @login_required
@@ -600,7 +1445,7 @@ def settings():
 
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
         if not User.query.filter_by(username="admin").first():
             default_password = generate_password_hash("password123")
 
@@ -648,4 +1493,8 @@ if __name__ == "__main__":
             )
             db.session.commit()
 
+        # Reconcile the KPI counters with whatever is already on disk
+        rebuild_counters()
+        rebuild_latest()
+
     app.run(debug=True)
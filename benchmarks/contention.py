@@ -0,0 +1,166 @@
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# --- SQLITE CONTENTION BENCHMARK ---
+# Runs concurrent device ingest (/api/vitals/batch) and dashboard polling
+# (/api/patient_history, /api/ward_history) against a seeded database, once
+# with the default SQLite setup and once with WAL + reader/writer pools.
+# Everything runs as threads in one process through the test client, so
+# absolute numbers include GIL contention; compare the two runs.
+#
+#   python benchmarks/contention.py [seconds] [writers] [readers]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+N_PATIENTS = 200
+SEED_ENTRIES = 20_000
+BATCH_SIZE = 20
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_worker(seconds, writers, readers):
+    sys.path.insert(0, ROOT)
+    from werkzeug.security import generate_password_hash
+    from app import app, db, User, Entry
+    from counters import rebuild_counters
+    from latest import rebuild_latest
+    from migrate import upgrade_schema
+
+    password = generate_password_hash("bench")
+    with app.app_context():
+        upgrade_schema()
+        db.session.execute(
+            db.insert(User),
+            [{"username": "nurse", "password": password, "role": "nurse"}]
+            + [
+                {"username": f"p{i}", "password": password, "role": "patient"}
+                for i in range(N_PATIENTS)
+            ],
+        )
+        db.session.execute(
+            db.insert(Entry),
+            [
+                {
+                    "user_id": 2 + i % N_PATIENTS,
+                    "name": f"p{i % N_PATIENTS}",
+                    "temp": 37.0,
+                    "hr": 80,
+                    "rr": 16,
+                    "sys_bp": 120,
+                    "dia_bp": 80,
+                    "status": "Stable",
+                    "advice": "",
+                }
+                for i in range(SEED_ENTRIES)
+            ],
+        )
+        db.session.commit()
+        rebuild_counters()
+        rebuild_latest()
+
+    deadline = time.perf_counter() + seconds
+    results = {"write": [], "read": []}
+    errors = {"write": 0, "read": 0}
+    lock = threading.Lock()
+
+    def client():
+        c = app.test_client()
+        c.post("/login", data={"username": "nurse", "password": "bench"})
+        return c
+
+    def writer():
+        c, rng = client(), random.Random()
+        while time.perf_counter() < deadline:
+            batch = [
+                {
+                    "name": f"p{rng.randrange(N_PATIENTS)}",
+                    "temperature": round(rng.uniform(36.0, 39.0), 1),
+                    "heart_rate": rng.randint(60, 120),
+                    "resp_rate": rng.randint(12, 24),
+                }
+                for _ in range(BATCH_SIZE)
+            ]
+            start = time.perf_counter()
+            try:
+                ok = c.post("/api/vitals/batch", json=batch).status_code == 200
+            except Exception:
+                ok = False
+            with lock:
+                results["write"].append(time.perf_counter() - start)
+                errors["write"] += not ok
+
+    def reader():
+        c, rng = client(), random.Random()
+        while time.perf_counter() < deadline:
+            url = (
+                f"/api/patient_history/{2 + rng.randrange(N_PATIENTS)}"
+                if rng.random() < 0.7
+                else "/api/ward_history?start=0&length=10"
+            )
+            start = time.perf_counter()
+            try:
+                ok = c.get(url).status_code == 200
+            except Exception:
+                ok = False
+            with lock:
+                results["read"].append(time.perf_counter() - start)
+                errors["read"] += not ok
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for kind in ("write", "read"):
+        samples = results[kind]
+        print(
+            f"{kind:5} reqs={len(samples):6d} rps={len(samples) / seconds:8.1f} "
+            f"p50={percentile(samples, 50) * 1e3:7.1f}ms "
+            f"p95={percentile(samples, 95) * 1e3:7.1f}ms "
+            f"p99={percentile(samples, 99) * 1e3:7.1f}ms errors={errors[kind]}"
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--worker"]:
+        seconds, writers, readers = (int(a) for a in sys.argv[2:5])
+        run_worker(seconds, writers, readers)
+        raise SystemExit(0)
+
+    seconds = sys.argv[1] if len(sys.argv) > 1 else "10"
+    writers = sys.argv[2] if len(sys.argv) > 2 else "4"
+    readers = sys.argv[3] if len(sys.argv) > 3 else "8"
+
+    print("--- SQLite Contention Benchmark ---")
+    print(f"{seconds}s, {writers} writer threads, {readers} reader threads\n")
+    for label, tuned in (
+        ("default journal, one pool", "0"),
+        ("WAL + reader/writer", "1"),
+    ):
+        workdir = tempfile.mkdtemp(prefix="vitalmine_contention_")
+        env = dict(
+            os.environ,
+            VITALMINE_SQLITE_TUNED=tuned,
+            VITALMINE_DATABASE_URI=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            PYTHONWARNINGS="ignore",
+        )
+        print(f"[{label}]")
+        sys.stdout.flush()
+        subprocess.run(
+            [sys.executable, __file__, "--worker", seconds, writers, readers],
+            env=env,
+            check=True,
+        )
+        print()
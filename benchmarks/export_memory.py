@@ -0,0 +1,172 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# --- EXPORT MEMORY BENCHMARK ---
+# Seeds wards of increasing size and downloads each export (/export_data,
+# /export_data.csv, /export_data.parquet) in a fresh process, reporting how
+# much the peak RSS grew during the download. The streaming exports should
+# stay flat as the ward grows; the previous pandas Excel implementation
+# (reproduced below) is run on the smaller wards for comparison.
+#
+#   python benchmarks/export_memory.py [sizes...]     e.g. 10000 100000 1000000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEGACY_MAX_ROWS = 100_000
+SEED_CHUNK = 50_000
+EXPORT_URLS = {
+    "xlsx": "/export_data",
+    "csv": "/export_data.csv",
+    "parquet": "/export_data.parquet",
+}
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def seed(n_rows):
+    sys.path.insert(0, ROOT)
+    from werkzeug.security import generate_password_hash
+    from app import app, db, User, Entry
+    from migrate import upgrade_schema
+
+    statuses = ("Stable", "Warning", "Critical")
+    start = datetime(2026, 1, 1)
+    with app.app_context():
+        upgrade_schema()
+        password = generate_password_hash("bench")
+        db.session.execute(
+            db.insert(User),
+            [
+                {"username": "admin", "password": password, "role": "admin"},
+                {"username": "p0", "password": password, "role": "patient"},
+            ],
+        )
+        for offset in range(0, n_rows, SEED_CHUNK):
+            db.session.execute(
+                db.insert(Entry),
+                [
+                    {
+                        "user_id": 2,
+                        "name": "p0",
+                        "temp": 37.0,
+                        "hr": 80,
+                        "rr": 16,
+                        "sys_bp": 120,
+                        "dia_bp": 80,
+                        "status": statuses[i % 3],
+                        "advice": "Vitals are normal. Continue standard care.",
+                        "timestamp": start + timedelta(seconds=i),
+                    }
+                    for i in range(offset, min(offset + SEED_CHUNK, n_rows))
+                ],
+            )
+            db.session.commit()
+
+
+def legacy_excel_report(all_entries):
+    """The pre-streaming export: one dict per row, a DataFrame, set_row per row."""
+    import io
+    import pandas as pd
+
+    output = io.BytesIO()
+    data = []
+    for e in all_entries:
+        data.append(
+            {
+                "Log ID": e.id,
+                "Timestamp": e.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                "Patient ID": e.name,
+                "Temp (°C)": e.temp,
+                "Heart Rate (bpm)": e.hr,
+                "Resp Rate (bpm)": e.rr,
+                "Blood Pressure": f"{e.sys_bp}/{e.dia_bp}",
+                "AI Risk Status": e.status,
+                "Clinical Advice": e.advice,
+            }
+        )
+    df = pd.DataFrame(data)
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name="Ward Telemetry")
+        workbook = writer.book
+        worksheet = writer.sheets["Ward Telemetry"]
+        critical_fmt = workbook.add_format({"bg_color": "#fca5a5"})
+        warning_fmt = workbook.add_format({"bg_color": "#fef08a"})
+        stable_fmt = workbook.add_format({"bg_color": "#d1fae5"})
+        for row_num in range(1, len(df) + 1):
+            status = df.iloc[row_num - 1]["AI Risk Status"]
+            if status in ["High", "Critical"]:
+                worksheet.set_row(row_num, None, critical_fmt)
+            elif status == "Warning":
+                worksheet.set_row(row_num, None, warning_fmt)
+            else:
+                worksheet.set_row(row_num, None, stable_fmt)
+    return len(output.getvalue())
+
+
+def export(mode):
+    sys.path.insert(0, ROOT)
+    from app import app, Entry
+
+    client = app.test_client()
+    client.post("/login", data={"username": "admin", "password": "bench"})
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+
+    if mode == "legacy":
+        with app.app_context():
+            size = legacy_excel_report(
+                Entry.query.order_by(Entry.timestamp.desc()).all()
+            )
+    else:
+        # Read the download in chunks so the client doesn't count against RSS
+        response = client.get(EXPORT_URLS[mode], buffered=False)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    print(
+        f"{elapsed:8.2f}s {size / 1e6:8.1f} MB  "
+        f"peak RSS {peak:7.1f} MB (+{peak - baseline:.1f} MB over startup)"
+    )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--seed"]:
+        seed(int(sys.argv[2]))
+        raise SystemExit(0)
+    if sys.argv[1:2] == ["--export"]:
+        export(sys.argv[2])
+        raise SystemExit(0)
+
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+
+    sys.path.insert(0, ROOT)
+    from exports import parquet_available
+
+    formats = [m for m in EXPORT_URLS if m != "parquet" or parquet_available()]
+
+    print("--- Export Memory Benchmark ---")
+    for n_rows in sizes:
+        workdir = tempfile.mkdtemp(prefix="vitalmine_export_")
+        env = dict(
+            os.environ,
+            VITALMINE_DATABASE_URI=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            PYTHONWARNINGS="ignore",
+        )
+        subprocess.run(
+            [sys.executable, __file__, "--seed", str(n_rows)], env=env, check=True
+        )
+        modes = formats + (["legacy"] if n_rows <= LEGACY_MAX_ROWS else [])
+        for mode in modes:
+            print(f"{n_rows:>9} rows  {mode:8}", end=" ", flush=True)
+            subprocess.run(
+                [sys.executable, __file__, "--export", mode], env=env, check=True
+            )
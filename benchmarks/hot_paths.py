@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# --- HOT PATH BENCHMARK SUITE ---
+# Seeds wards of increasing size and times the pages and APIs the ward
+# actually hits through the Flask test client, recording for each one the
+# latency, how many SQL statements a request issues and the peak Python
+# memory it allocates. Every size is seeded and measured in its own
+# processes. Results are written as JSON so two releases can be compared:
+#
+#   python benchmarks/hot_paths.py                       10k, 100k and 1M rows
+#   python benchmarks/hot_paths.py 10000 --out before.json
+#   python benchmarks/hot_paths.py 10000 --compare before.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SEED_CHUNK = 50_000
+ENTRIES_PER_PATIENT = 200
+MIN_PATIENTS = 2000
+HEAVY_REPEAT = 3  # whole-table exports
+
+ENDPOINTS = (
+    "home",
+    "patients_directory",
+    "patient_file",
+    "get_patient_history",
+    "add_vitals",
+    "export_data",
+    "generate_pdf",
+)
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def seed(n_rows):
+    """n_rows readings spread over thousands of patients, via the flask seed code."""
+    sys.path.insert(0, ROOT)
+    from werkzeug.security import generate_password_hash
+    from app import app, db, User, live_model
+    from migrate import upgrade_schema
+    from seed import seed_ward
+
+    n_patients = max(MIN_PATIENTS, n_rows // ENTRIES_PER_PATIENT)
+    with app.app_context():
+        upgrade_schema()
+        db.session.add(
+            User(
+                username="admin",
+                password=generate_password_hash("bench"),
+                role="admin",
+            )
+        )
+        db.session.commit()
+        seed_ward(
+            n_patients,
+            n_rows // n_patients,
+            scorer=live_model.scorer(),
+            batch_size=SEED_CHUNK,
+            random_seed=42,
+            password="bench",
+        )
+
+
+def measure(n_rows, repeat, out_path):
+    sys.path.insert(0, ROOT)
+    import random
+    from sqlalchemy import event
+    from app import app, db, User, Entry
+    from wearable_device import get_virtual_vitals
+
+    rng = random.Random(7)
+    with app.app_context():
+        patients = db.session.query(User.id, User.username).filter_by(role="patient")
+        patients = patients.all()
+        max_entry = db.session.query(db.func.max(Entry.id)).scalar()
+        engines = list(db.engines.values())
+
+    queries = [0]
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        queries[0] += 1
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", count)
+
+    client = app.test_client()
+    client.post("/login", data={"username": "admin", "password": "bench"})
+
+    def add_vitals():
+        scenario = rng.choices(["stable", "sepsis", "hypothermia"], [8, 1.5, 0.5])[0]
+        form = dict(get_virtual_vitals(scenario), name=rng.choice(patients)[1])
+        return client.post("/add_vitals", data=form)
+
+    requests = {
+        "home": lambda: client.get("/"),
+        "patients_directory": lambda: client.get("/patients"),
+        "patient_file": lambda: client.get(f"/patient_file/{rng.choice(patients)[0]}"),
+        "get_patient_history": lambda: client.get(
+            f"/api/patient_history/{rng.choice(patients)[0]}"
+        ),
+        "add_vitals": add_vitals,
+        "export_data": lambda: client.get("/export_data"),
+        # Random entries, so mostly renders rather than PDF cache hits
+        "generate_pdf": lambda: client.get(
+            f"/generate_pdf/{rng.randint(1, max_entry)}"
+        ),
+    }
+
+    def call(name):
+        response = requests[name]()
+        size = len(response.get_data())
+        response.close()
+        if response.status_code not in (200, 302):
+            raise RuntimeError(f"{name}: HTTP {response.status_code}")
+        return size
+
+    results = {}
+    for name in ENDPOINTS:
+        runs = HEAVY_REPEAT if name == "export_data" else repeat
+        if name != "export_data":
+            call(name)  # warm-up: templates, imports, first-touch caches
+        timings, counts = [], []
+        for _ in range(runs):
+            queries[0] = 0
+            start = time.perf_counter()
+            size = call(name)
+            timings.append(time.perf_counter() - start)
+            counts.append(queries[0])
+
+        # One more call under tracemalloc, kept out of the timings
+        tracemalloc.start()
+        call(name)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[name] = {
+            "n": runs,
+            "mean_ms": statistics.mean(timings) * 1e3,
+            "p50_ms": percentile(timings, 50) * 1e3,
+            "p95_ms": percentile(timings, 95) * 1e3,
+            "max_ms": max(timings) * 1e3,
+            "queries": max(counts),
+            "peak_alloc_mb": peak / 1e6,
+            "response_kb": size / 1e3,
+        }
+        print(
+            f"  {name:20} p50={results[name]['p50_ms']:9.2f}ms "
+            f"p95={results[name]['p95_ms']:9.2f}ms "
+            f"queries={results[name]['queries']:3d} "
+            f"peak={results[name]['peak_alloc_mb']:7.1f} MB",
+            flush=True,
+        )
+
+    with open(out_path, "w") as f:
+        json.dump(
+            {
+                "patients": len(patients),
+                "peak_rss_mb": peak_rss_mb(),
+                "endpoints": results,
+            },
+            f,
+        )
+
+
+def compare(current, baseline):
+    print(f"\n--- Compared with {baseline['revision']} ({baseline['created']}) ---")
+    for size, run in current["sizes"].items():
+        old_run = baseline["sizes"].get(size)
+        if not old_run:
+            continue
+        print(f"{int(size):>9} rows")
+        for name, new in run["endpoints"].items():
+            old = old_run["endpoints"].get(name)
+            if not old:
+                continue
+            change = (new["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+            flag = " ⚠️" if change > 20 else ""
+            print(
+                f"  {name:20} p50 {old['p50_ms']:9.2f} -> {new['p50_ms']:9.2f}ms "
+                f"({change:+6.1f}%)  queries {old['queries']:3d} -> "
+                f"{new['queries']:3d}  peak {old['peak_alloc_mb']:7.1f} -> "
+                f"{new['peak_alloc_mb']:7.1f} MB{flag}"
+            )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--seed"]:
+        seed(int(sys.argv[2]))
+        raise SystemExit(0)
+    if sys.argv[1:2] == ["--measure"]:
+        measure(int(sys.argv[2]), int(sys.argv[3]), sys.argv[4])
+        raise SystemExit(0)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", nargs="*", type=int)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", help="results file (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+    sizes = args.sizes or [10_000, 100_000, 1_000_000]
+
+    revision = git_revision()
+    results = {
+        "revision": revision,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+
+    print("--- Hot Path Benchmark ---")
+    for n_rows in sizes:
+        workdir = tempfile.mkdtemp(prefix="vitalmine_hot_")
+        env = dict(
+            os.environ,
+            VITALMINE_DATABASE_URI=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            VITALMINE_PDF_CACHE=os.path.join(workdir, "pdf_cache"),
+            PYTHONWARNINGS="ignore",
+        )
+        print(f"{n_rows:>9} rows: seeding...", flush=True)
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, __file__, "--seed", str(n_rows)], env=env, check=True
+        )
+        seed_seconds = time.perf_counter() - start
+
+        out_path = os.path.join(workdir, "measure.json")
+        subprocess.run(
+            [sys.executable, __file__, "--measure", str(n_rows)]
+            + [str(args.repeat), out_path],
+            env=env,
+            check=True,
+        )
+        with open(out_path) as f:
+            run = json.load(f)
+        run["seed_seconds"] = seed_seconds
+        results["sizes"][str(n_rows)] = run
+
+    out = args.out or os.path.join(RESULTS_DIR, f"hot_paths-{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
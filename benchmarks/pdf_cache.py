@@ -0,0 +1,85 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# --- PDF REPORT CACHE BENCHMARK ---
+# Seeds a ward, then downloads /generate_pdf/<id> for every entry twice: the
+# first pass renders each report and stores it (cold), the second serves it
+# from the on-disk cache (warm).
+#
+#   python benchmarks/pdf_cache.py [n_entries]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label, samples):
+    print(
+        f"{label:6} n={len(samples):5d} "
+        f"mean={statistics.mean(samples) * 1e3:7.2f}ms "
+        f"p50={percentile(samples, 50) * 1e3:7.2f}ms "
+        f"p95={percentile(samples, 95) * 1e3:7.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    n_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    workdir = tempfile.mkdtemp(prefix="vitalmine_pdf_")
+    os.environ["VITALMINE_DATABASE_URI"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["VITALMINE_PDF_CACHE"] = os.path.join(workdir, "pdf_cache")
+    sys.path.insert(0, ROOT)
+
+    from werkzeug.security import generate_password_hash
+    from app import app, db, User, Entry
+    from migrate import upgrade_schema
+
+    statuses = ("Stable", "Warning", "Critical")
+    with app.app_context():
+        upgrade_schema()
+        password = generate_password_hash("bench")
+        db.session.execute(
+            db.insert(User),
+            [
+                {"username": "doctor", "password": password, "role": "doctor"},
+                {"username": "p0", "password": password, "role": "patient"},
+            ],
+        )
+        db.session.execute(
+            db.insert(Entry),
+            [
+                {
+                    "user_id": 2,
+                    "name": "p0",
+                    "temp": 37.0 + (i % 30) / 10,
+                    "hr": 60 + i % 70,
+                    "rr": 16,
+                    "sys_bp": 120,
+                    "dia_bp": 80,
+                    "status": statuses[i % 3],
+                    "advice": "Vitals are normal. Continue standard care.",
+                }
+                for i in range(n_entries)
+            ],
+        )
+        db.session.commit()
+
+    client = app.test_client()
+    client.post("/login", data={"username": "doctor", "password": "bench"})
+
+    print("--- PDF Report Cache Benchmark ---")
+    for label in ("cold", "warm"):
+        samples = []
+        for entry_id in range(1, n_entries + 1):
+            start = time.perf_counter()
+            response = client.get(f"/generate_pdf/{entry_id}")
+            response.get_data()
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 200
+        report(label, samples)
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from datetime import datetime
+
+# --- STARTUP TIME BENCHMARK ---
+# How long a fresh worker takes to `import app`, how much memory it holds
+# afterwards, and where the import time goes (`python -X importtime`). It
+# also guards the lazy loading of the heavy dependencies: if any module in
+# HEAVY is imported by `import app` alone, the run fails. The cost each one
+# adds on first use is timed separately, so it stays visible.
+#
+#   python benchmarks/startup.py
+#   python benchmarks/startup.py --budget-ms 1500 --out before.json
+#   python benchmarks/startup.py --compare before.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Only loaded when a PDF, Excel file, Parquet export, AI answer, retraining
+# run or (with sklearn) the first model load needs them
+HEAVY = (
+    "pandas",
+    "sklearn",
+    "scipy",
+    "joblib",
+    "reportlab",
+    "xlsxwriter",
+    "pyarrow",
+    "google.genai",
+)
+
+IMPORT_APP = """
+import json, resource, sys, time
+start = time.perf_counter()
+import app
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "heavy": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY,)
+
+# What each lazy path costs the first request that takes it
+FIRST_USE = """
+import json, time
+import app
+costs = {}
+def timed(name, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+    except ImportError:  # optional dependency not installed
+        return
+    costs[name] = time.perf_counter() - start
+timed("pdf (reportlab)", lambda: __import__("pdf_report"))
+timed("excel (xlsxwriter)", lambda: __import__("xlsxwriter"))
+timed("parquet (pyarrow)", lambda: __import__("pyarrow.parquet"))
+timed("ai (google.genai)", lambda: __import__("google.genai"))
+timed("model load", app.live_model.ensure_loaded)
+print(json.dumps(costs))
+"""
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_child(code, env, importtime=False):
+    """Runs code in a fresh interpreter. Returns (last stdout line as JSON, stderr)."""
+    args = [sys.executable] + (["-X", "importtime"] if importtime else [])
+    done = subprocess.run(
+        args + ["-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if done.returncode != 0:
+        raise RuntimeError(done.stderr.strip().splitlines()[-1])
+    return json.loads(done.stdout.strip().splitlines()[-1]), done.stderr
+
+
+def parse_importtime(stderr):
+    """
+    Self time (us) per top-level package and the cumulative time of `app`,
+    from the `import time: self | cumulative | name` lines.
+    """
+    by_package = Counter()
+    app_us = None
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header line
+        name = name.strip()
+        by_package[name.split(".")[0]] += int(self_us)
+        if name == "app":
+            app_us = int(cumulative_us)
+    return app_us, by_package
+
+
+def compare(current, baseline):
+    print(f"\n--- Compared with {baseline['revision']} ({baseline['created']}) ---")
+    for key, unit in (("p50_ms", "ms"), ("rss_mb", "MB")):
+        old, new = baseline[key], current[key]
+        change = (new - old) / old * 100
+        flag = " ⚠️" if change > 20 else ""
+        print(f"  {key:8} {old:8.1f} -> {new:8.1f} {unit} ({change:+6.1f}%){flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument(
+        "--budget-ms", type=float, help="fail if the median import is slower"
+    )
+    parser.add_argument("--out", help="results file (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    # A throwaway database and registry, so only the code is being measured
+    workdir = tempfile.mkdtemp(prefix="vitalmine_startup_")
+    env = dict(
+        os.environ,
+        VITALMINE_DATABASE_URI=f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        VITALMINE_MODEL_REGISTRY=os.path.join(workdir, "model_registry"),
+        VITALMINE_PDF_CACHE=os.path.join(workdir, "pdf_cache"),
+        PYTHONWARNINGS="ignore",
+    )
+    env.pop("VITALMINE_PRELOAD_MODEL", None)
+
+    print("--- Startup Time Benchmark ---")
+    run_child(IMPORT_APP, env)  # warm-up: bytecode caches, the empty database
+    runs = [run_child(IMPORT_APP, env)[0] for _ in range(args.runs)]
+    timings = [run["seconds"] * 1e3 for run in runs]
+    heavy = sorted({m for run in runs for m in run["heavy"]})
+    _, stderr = run_child(IMPORT_APP, env, importtime=True)
+    app_us, by_package = parse_importtime(stderr)
+    first_use, _ = run_child(FIRST_USE, env)
+
+    revision = git_revision()
+    results = {
+        "revision": revision,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "runs": args.runs,
+        "p50_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+        "rss_mb": statistics.median(run["rss_mb"] for run in runs),
+        "modules": runs[-1]["modules"],
+        "importtime_app_ms": app_us / 1e3 if app_us else None,
+        "packages_ms": {
+            name: us / 1e3 for name, us in by_package.most_common(args.top)
+        },
+        "first_use_ms": {name: s * 1e3 for name, s in first_use.items()},
+        "heavy_imported": heavy,
+    }
+
+    print(
+        f"import app  p50={results['p50_ms']:7.1f}ms  min={results['min_ms']:7.1f}ms"
+        f"  max={results['max_ms']:7.1f}ms  rss={results['rss_mb']:6.1f} MB"
+        f"  modules={results['modules']}"
+    )
+    print("\nSlowest packages (self time under -X importtime):")
+    for name, ms in results["packages_ms"].items():
+        print(f"  {name:24} {ms:8.1f}ms")
+    print("\nDeferred to first use:")
+    for name, ms in results["first_use_ms"].items():
+        print(f"  {name:24} {ms:8.1f}ms")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"startup-{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    failed = False
+    if heavy:
+        print(f"\n🚨 `import app` loaded heavy dependencies: {', '.join(heavy)}")
+        failed = True
+    if args.budget_ms and results["p50_ms"] > args.budget_ms:
+        print(
+            f"\n🚨 Median import {results['p50_ms']:.1f}ms is over the "
+            f"{args.budget_ms:.0f}ms budget"
+        )
+        failed = True
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,97 @@
+from sqlalchemy import func, update
+
+from models import db, User, Entry, WardCounter
+
+# --- WARD KPI COUNTERS ---
+# Every write that changes a KPI also bumps the matching WardCounter row in
+# the same transaction, so reading the dashboard cards is a single lookup.
+# rebuild_counters() recomputes everything from the source tables.
+
+HIGH_STATUSES = ["High", "Critical"]
+STAFF_ROLES = ["doctor", "nurse"]
+
+COUNTER_KEYS = (
+    "entries_total",
+    "entries_high",
+    "users_total",
+    "users_staff",
+    "users_patient",
+)
+
+
+def adjust_counters(**deltas):
+    """Applies relative changes, e.g. adjust_counters(entries_total=1)."""
+    for key, delta in deltas.items():
+        if delta:
+            db.session.execute(
+                update(WardCounter)
+                .where(WardCounter.key == key)
+                .values(value=WardCounter.value + delta)
+            )
+
+
+def count_entries(statuses, sign=1):
+    """Adjusts the entry counters for a list of newly written/deleted statuses."""
+    adjust_counters(
+        entries_total=sign * len(statuses),
+        entries_high=sign * sum(1 for s in statuses if s in HIGH_STATUSES),
+    )
+
+
+def count_user(role, sign=1):
+    """Adjusts the user counters for a user joining (+1) or leaving (-1)."""
+    adjust_counters(
+        users_total=sign,
+        users_staff=sign if role in STAFF_ROLES else 0,
+        users_patient=sign if role == "patient" else 0,
+    )
+
+
+def discount_user_entries(user_id):
+    """Takes a patient's entries off the counters ahead of deleting them."""
+    removed, removed_high = (
+        db.session.query(
+            func.count(Entry.id),
+            func.count(Entry.id).filter(Entry.status.in_(HIGH_STATUSES)),
+        )
+        .filter(Entry.user_id == user_id)
+        .one()
+    )
+    adjust_counters(entries_total=-removed, entries_high=-removed_high)
+
+
+def compute_counters():
+    """Counts everything from scratch with SQL aggregates."""
+    entries_total, entries_high = db.session.query(
+        func.count(Entry.id),
+        func.count(Entry.id).filter(Entry.status.in_(HIGH_STATUSES)),
+    ).one()
+    users_total, users_staff, users_patient = db.session.query(
+        func.count(User.id),
+        func.count(User.id).filter(User.role.in_(STAFF_ROLES)),
+        func.count(User.id).filter(User.role == "patient"),
+    ).one()
+    return {
+        "entries_total": entries_total,
+        "entries_high": entries_high,
+        "users_total": users_total,
+        "users_staff": users_staff,
+        "users_patient": users_patient,
+    }
+
+
+def rebuild_counters():
+    """Reconciles the counters table against Entry and User. Commits."""
+    counts = compute_counters()
+    WardCounter.query.delete()
+    db.session.add_all(WardCounter(key=k, value=v) for k, v in counts.items())
+    db.session.commit()
+    return counts
+
+
+def read_counters():
+    counts = dict(db.session.query(WardCounter.key, WardCounter.value))
+    if len(counts) < len(COUNTER_KEYS):
+        # First run against a database that predates the counters table
+        counts = rebuild_counters()
+    return counts
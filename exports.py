@@ -0,0 +1,118 @@
+import csv
+import importlib.util
+import io
+
+# --- RAW DATA EXPORTS ---
+# Generators that turn a streamed Entry query into CSV or Parquet bytes one
+# chunk at a time, for responses that never hold the whole table in memory.
+# Both take a SQLAlchemy Result (ideally executed with yield_per) whose
+# columns are RAW_COLUMNS in order.
+
+RAW_COLUMNS = (
+    "id",
+    "user_id",
+    "name",
+    "temp",
+    "hr",
+    "rr",
+    "sys_bp",
+    "dia_bp",
+    "status",
+    "advice",
+    "timestamp",
+)
+
+
+def csv_chunks(result, chunk_rows=5000):
+    """Yields the header, then one encoded block of CSV lines per chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(RAW_COLUMNS)
+    for rows in result.partitions(chunk_rows):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def parquet_available():
+    # Parquet export is optional; pyarrow itself is only imported when used
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("name", pa.string()),
+            ("temp", pa.float64()),
+            ("hr", pa.int64()),
+            ("rr", pa.int64()),
+            ("sys_bp", pa.int64()),
+            ("dia_bp", pa.int64()),
+            ("status", pa.string()),
+            ("advice", pa.string()),
+            ("timestamp", pa.timestamp("us")),
+        ]
+    )
+
+
+class ChunkSink:
+    """Write-only file object that hands back whatever was written since last drain."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_chunks(result, row_group_rows=50_000):
+    """
+    Yields a Parquet file as it is written: every chunk of rows becomes one
+    row group, and its bytes are sent before the next chunk is fetched.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    sink = ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in result.partitions(row_group_rows):
+            columns = list(zip(*rows))
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        pa.array(values, type=field.type)
+                        for values, field in zip(columns, schema)
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
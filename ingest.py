@@ -0,0 +1,151 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+from models import db, Entry
+from counters import count_entries
+from latest import record_latest
+
+# --- INGESTION ---
+# write_entries() is the one place readings hit the database: the Entry
+# insert plus the latest-reading projection and KPI counters, all in the
+# caller's transaction. WriteBehindQueue optionally moves that work off the
+# request thread and commits readings in groups.
+
+
+def write_entries(rows):
+    """
+    Inserts reading dicts (Entry column names) with one executemany and
+    updates the projections. Fills in entry_id/timestamp. Caller commits.
+    """
+    inserted = db.session.execute(
+        db.insert(Entry).returning(
+            Entry.id, Entry.timestamp, sort_by_parameter_order=True
+        ),
+        rows,
+    )
+    for row, (entry_id, timestamp) in zip(rows, inserted):
+        row["entry_id"] = entry_id
+        row["timestamp"] = timestamp
+    record_latest(rows)
+    count_entries([row["status"] for row in rows])
+    return rows
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue drained by one writer thread. Readings are
+    flushed in a single transaction once batch_size rows are waiting or
+    flush_interval seconds have passed since the first one arrived. The
+    writer starts with the first submit(), so building one is side-effect free.
+    """
+
+    def __init__(
+        self,
+        app,
+        batch_size=500,
+        flush_interval=0.05,
+        max_queue=10000,
+        put_timeout=1.0,
+        on_commit=None,
+    ):
+        self.app = app
+        self.on_commit = on_commit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.retries = 3
+        self.flushed = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="vitalmine-write-behind", daemon=True
+        )
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if not self._started:
+                self._thread.start()
+                atexit.register(self.stop)
+                self._started = True
+        return self
+
+    def submit(self, rows):
+        """
+        Queues one request's readings. Returns False if the queue stayed full
+        (or is shutting down) so the caller can write synchronously instead.
+        """
+        if self._stopping.is_set():
+            return False
+        if not self._started:
+            self.start()
+        now = datetime.utcnow()
+        for row in rows:
+            row.setdefault("timestamp", now)
+        try:
+            self._queue.put(rows, timeout=self.put_timeout)
+        except queue.Full:
+            return False
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stop(self, timeout=30):
+        """Stops taking readings and waits for everything queued to commit."""
+        self._stopping.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                batch = list(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.extend(self._queue.get(timeout=remaining))
+                    else:
+                        batch.extend(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        with self.app.app_context():
+            for attempt in range(1, self.retries + 1):
+                try:
+                    write_entries(batch)
+                    db.session.commit()
+                    break
+                except Exception as e:
+                    db.session.rollback()
+                    for row in batch:
+                        row.pop("entry_id", None)
+                    print(f"⚠️ Write-behind flush failed (attempt {attempt}): {e}")
+                    time.sleep(0.1 * attempt)
+                finally:
+                    db.session.remove()
+            else:
+                self.dropped += len(batch)
+                print("\n" + "=" * 50)
+                print(
+                    f"🚨 WRITE-BEHIND: dropped {len(batch)} readings after {self.retries} attempts"
+                )
+                print("=" * 50 + "\n")
+                return
+
+        self.flushed += len(batch)
+        if self.on_commit:
+            self.on_commit(batch)
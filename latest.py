@@ -0,0 +1,119 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, Entry, PatientLatest
+
+# --- LATEST READING PROJECTION ---
+# PatientLatest keeps one row per patient with their newest reading. Writers
+# upsert it in the same transaction as the Entry insert; readers join it to
+# User instead of running a "latest Entry" query per patient.
+
+PROJECTED_COLUMNS = (
+    "entry_id",
+    "temp",
+    "hr",
+    "rr",
+    "sys_bp",
+    "dia_bp",
+    "status",
+    "timestamp",
+)
+
+_backfill_checked = False
+
+
+def record_latest(entries):
+    """
+    Upserts the projection from newly inserted readings. Each item is a dict
+    (or Entry) with user_id, entry_id/id, vitals, status and timestamp.
+    Readings older than what's already projected are ignored.
+    """
+    newest = {}
+    for e in entries:
+        row = e if isinstance(e, dict) else projection_row(e)
+        if row["user_id"] is None:
+            continue
+        current = newest.get(row["user_id"])
+        if current is None or (row["timestamp"], row["entry_id"]) > (
+            current["timestamp"],
+            current["entry_id"],
+        ):
+            newest[row["user_id"]] = row
+
+    if not newest:
+        return
+
+    stmt = sqlite_insert(PatientLatest)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PatientLatest.user_id],
+        set_={c: stmt.excluded[c] for c in PROJECTED_COLUMNS},
+        where=stmt.excluded.timestamp >= PatientLatest.timestamp,
+    )
+    db.session.execute(stmt, list(newest.values()))
+
+
+def projection_row(e):
+    return {
+        "user_id": e.user_id,
+        "entry_id": e.id,
+        "temp": e.temp,
+        "hr": e.hr,
+        "rr": e.rr,
+        "sys_bp": e.sys_bp,
+        "dia_bp": e.dia_bp,
+        "status": e.status,
+        "timestamp": e.timestamp,
+    }
+
+
+def forget_latest(user_id):
+    PatientLatest.query.filter_by(user_id=user_id).delete()
+
+
+def rebuild_latest():
+    """Recomputes the whole projection from Entry in one statement. Commits."""
+    ranked = (
+        select(
+            Entry.user_id,
+            Entry.id.label("entry_id"),
+            Entry.temp,
+            Entry.hr,
+            Entry.rr,
+            Entry.sys_bp,
+            Entry.dia_bp,
+            Entry.status,
+            Entry.timestamp,
+            func.row_number()
+            .over(
+                partition_by=Entry.user_id,
+                order_by=(Entry.timestamp.desc(), Entry.id.desc()),
+            )
+            .label("rank"),
+        )
+        .where(Entry.user_id.isnot(None))
+        .subquery()
+    )
+    columns = ("user_id",) + PROJECTED_COLUMNS
+    PatientLatest.query.delete()
+    db.session.execute(
+        insert(PatientLatest).from_select(
+            columns,
+            select(*(ranked.c[c] for c in columns)).where(ranked.c.rank == 1),
+        )
+    )
+    db.session.commit()
+    return PatientLatest.query.count()
+
+
+def ensure_latest():
+    """Backfills the projection once per process for pre-existing databases."""
+    global _backfill_checked
+    if _backfill_checked:
+        return
+    # MAX(user_id) is answered straight from the (user_id, timestamp) index
+    if (
+        PatientLatest.query.first() is None
+        and db.session.query(func.max(Entry.user_id)).scalar() is not None
+    ):
+        rebuild_latest()
+    _backfill_checked = True
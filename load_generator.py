@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from wearable_device import BASE_URL, PASSWORD, get_virtual_vitals
+
+# --- WEARABLE FLEET LOAD GENERATOR ---
+# Non-interactive version of wearable_device.py for sizing a deployment.
+# Every simulated device is an asyncio task that logs in as its own patient
+# and streams readings from one of the get_virtual_vitals scenarios, either
+# one form post per reading (/add_vitals) or in uploads of several readings
+# (/api/vitals/batch). All devices share one connection pool, so a few
+# thousand of them fit in a single process. Start the server first.
+#
+#   python load_generator.py --devices 2000 --interval 5 --duration 60 --create-patients
+#   python load_generator.py --devices 500 --batch 20 --mix stable=0.7,sepsis=0.2,hypothermia=0.1
+
+SCENARIOS = ("stable", "sepsis", "hypothermia")
+DEFAULT_MIX = "stable=0.8,sepsis=0.15,hypothermia=0.05"
+
+
+def parse_mix(text):
+    """'stable=0.8,sepsis=0.2' -> {'stable': 0.8, 'sepsis': 0.2}"""
+    mix = {}
+    for part in text.split(","):
+        scenario, _, weight = part.partition("=")
+        scenario = scenario.strip()
+        if scenario not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {scenario!r}")
+        mix[scenario] = float(weight or 1)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("Scenario mix has no weight.")
+    return mix
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class LoadStats:
+    """Latencies (seconds) and error counts per endpoint."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.readings = 0
+        self.rejected = 0
+
+    def record(self, endpoint, seconds, error=None):
+        if error:
+            self.errors[endpoint][error] += 1
+        else:
+            self.latencies[endpoint].append(seconds)
+
+    def report(self, elapsed):
+        print(f"\n--- Load Test Results ({elapsed:.1f}s) ---")
+        print(
+            f"{'endpoint':22} {'ok':>8} {'errors':>7} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            ok = self.latencies[endpoint]
+            errors = sum(self.errors[endpoint].values())
+            line = f"{endpoint:22} {len(ok):>8} {errors:>7} {len(ok) / elapsed:>8.1f}"
+            if ok:
+                line += "".join(
+                    f" {percentile(ok, p) * 1000:>8.1f}" for p in (50, 95, 99)
+                )
+            print(line)
+        print(
+            f"\nReadings stored: {self.readings} ({self.readings / elapsed:.1f}/s)"
+            f"  rejected by server: {self.rejected}"
+        )
+        for endpoint, errors in sorted(self.errors.items()):
+            for error, count in errors.most_common():
+                print(f"⚠️ {endpoint}: {count} x {error}")
+
+
+async def timed(stats, endpoint, request, check):
+    """Runs one request; check(response) returns an error label or None."""
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as e:
+        stats.record(endpoint, 0, type(e).__name__)
+        return None
+    error = check(response)
+    stats.record(endpoint, time.perf_counter() - start, error)
+    return None if error else response
+
+
+def redirect_check(response):
+    """Form posts answer with a redirect; being sent to /login means no session."""
+    if response.status_code != 302:
+        return f"HTTP {response.status_code}"
+    if "/login" in response.headers.get("location", ""):
+        return "not logged in"
+    return None
+
+
+def login_check(response):
+    # A failed login re-renders the form with 200 instead of redirecting
+    return (
+        "bad credentials" if response.status_code == 200 else redirect_check(response)
+    )
+
+
+def register_check(response):
+    # An existing username bounces back to /register, which is fine here
+    return None if response.status_code == 302 else f"HTTP {response.status_code}"
+
+
+def json_check(response):
+    return None if response.status_code == 200 else f"HTTP {response.status_code}"
+
+
+async def register_patient(client, stats, username, password):
+    form = {
+        "username": username,
+        "email": f"{username}@loadtest.local",
+        "password": password,
+        "role": "patient",
+    }
+    await timed(stats, "register", client.post("/register", data=form), register_check)
+
+
+async def run_device(index, scenario, args, transport, stats, stop_at):
+    username = f"{args.prefix}{index}"
+    # Own client (and so own session cookie) per device, shared connection pool.
+    # Clients are not closed individually: that would close the transport.
+    client = httpx.AsyncClient(
+        base_url=args.url, transport=transport, timeout=args.timeout
+    )
+
+    # Stagger start-up so logins don't all land in the same instant
+    await asyncio.sleep(random.uniform(0, args.ramp_up))
+    if args.create_patients:
+        await register_patient(client, stats, username, args.password)
+    login = {"username": username, "password": args.password}
+    if not await timed(stats, "login", client.post("/login", data=login), login_check):
+        return
+
+    pending = []
+    next_reading = time.perf_counter() + random.uniform(0, args.interval)
+    while next_reading < stop_at:
+        await asyncio.sleep(max(0, next_reading - time.perf_counter()))
+        next_reading += args.interval
+        pending.append(get_virtual_vitals(scenario))
+        if len(pending) < args.batch:
+            continue
+
+        if args.batch == 1:
+            response = await timed(
+                stats,
+                "/add_vitals",
+                client.post("/add_vitals", data=pending[0]),
+                redirect_check,
+            )
+            stats.readings += response is not None
+        else:
+            response = await timed(
+                stats,
+                "/api/vitals/batch",
+                client.post("/api/vitals/batch", json=pending),
+                json_check,
+            )
+            if response is not None:
+                body = response.json()
+                stats.readings += body["accepted"]
+                stats.rejected += body["rejected"]
+        pending = []
+
+
+async def run(args):
+    scenarios = random.choices(
+        list(args.mix), weights=list(args.mix.values()), k=args.devices
+    )
+    print("--- 🏥 VitalMine Wearable Load Generator ---")
+    print(f"Target Server: {args.url}")
+    print(
+        f"{args.devices} devices, one reading every {args.interval}s each "
+        f"(~{args.devices / args.interval:.0f} readings/s), "
+        f"{'form posts' if args.batch == 1 else f'batches of {args.batch}'}, "
+        f"{args.duration}s"
+    )
+    print(
+        "Scenario mix: " + ", ".join(f"{s}={n}" for s, n in Counter(scenarios).items())
+    )
+
+    stats = LoadStats()
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=args.connections, max_keepalive_connections=args.connections
+        )
+    )
+    start = time.perf_counter()
+    stop_at = start + args.ramp_up + args.duration
+    try:
+        await asyncio.gather(
+            *(
+                run_device(i, scenario, args, transport, stats, stop_at)
+                for i, scenario in enumerate(scenarios)
+            )
+        )
+    finally:
+        await transport.aclose()
+    stats.report(time.perf_counter() - start)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulates a fleet of wearables against a running server."
+    )
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument(
+        "--interval", type=float, default=30, help="seconds between readings"
+    )
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--ramp-up", type=float, default=10, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=1,
+        help="readings per upload; above 1 posts to /api/vitals/batch",
+    )
+    parser.add_argument("--prefix", default="load_patient_")
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument(
+        "--create-patients",
+        action="store_true",
+        help="register each device's patient before logging in",
+    )
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    if args.batch < 1:
+        parser.error("--batch must be at least 1")
+
+    random.seed(args.seed)
+    try:
+        stats = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("\n🛑 Load Test Stopped.")
+        return 1
+    return 1 if not stats.readings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,637 @@
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from dotenv import load_dotenv
+
+# --- VITALBOT (LLM) INTEGRATION ---
+# One model backend per process, chosen by VITALMINE_AI_BACKEND: "gemini"
+# (default, needs GEMINI_API_KEY) or "stub", a local canned-answer model for
+# tests and benchmarks. Answers are cached for a few minutes, keyed by the
+# normalized question and a hash of the patient context, so repeat
+# questions about an unchanged patient don't go back to the model.
+
+load_dotenv()
+
+GEMINI_MODEL = "gemini-2.5-flash"
+AI_CACHE_MAX_ENTRIES = 512
+AI_CACHE_TTL_SECONDS = 300
+
+AI_CONFIG_ERROR = "Configuration Error: API Key missing in .env file."
+AI_FALLBACK_MESSAGE = "I am having trouble connecting to the AI server. Please check your internet or API Key."
+
+
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, api_key, model=GEMINI_MODEL):
+        # --- NEW GOOGLE GENAI SDK ---
+        # Imported here, when the first question is asked: the SDK is slow to
+        # load and most workers never talk to the model
+        from google import genai
+        from google.genai import types
+
+        self.model = model
+        # Created once: the client keeps its HTTP connections open between calls
+        self.client = genai.Client(api_key=api_key)
+        # Turn off censorship using the NEW SDK formatting
+        self.config = types.GenerateContentConfig(
+            safety_settings=[
+                types.SafetySetting(
+                    category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_NONE"
+                ),
+                types.SafetySetting(
+                    category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE"
+                ),
+                types.SafetySetting(
+                    category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_NONE"
+                ),
+                types.SafetySetting(
+                    category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_NONE"
+                ),
+            ]
+        )
+
+    def generate(self, prompt):
+        response = self.client.models.generate_content(
+            model=self.model, contents=prompt, config=self.config
+        )
+        return response.text
+
+    def stream(self, prompt):
+        for chunk in self.client.models.generate_content_stream(
+            model=self.model, contents=prompt, config=self.config
+        ):
+            if chunk.text:
+                yield chunk.text
+
+
+class StubBackend:
+    """
+    Local stand-in for the model: a canned answer after an optional delay.
+    When streamed, the answer arrives word by word, token_delay apart.
+    A fraction of calls (error_rate) fail after the delay, like a flaky API.
+    """
+
+    name = "stub"
+
+    def __init__(self, delay=0.0, reply=None, token_delay=0.0, error_rate=0.0):
+        self.delay = delay
+        self.reply = reply
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.rng = random.Random(0)
+
+    def answer(self, prompt):
+        with self.lock:
+            self.calls += 1
+            failing = self.rng.random() < self.error_rate
+        if self.delay:
+            time.sleep(self.delay)
+        if failing:
+            raise RuntimeError("Stub backend: injected failure")
+        if self.reply is not None:
+            return self.reply
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"VitalBot (stub {digest}): Vitals reviewed. Continue monitoring."
+
+    def generate(self, prompt):
+        answer = self.answer(prompt)
+        if self.token_delay:
+            time.sleep(self.token_delay * len(answer.split(" ")))
+        return answer
+
+    def stream(self, prompt):
+        words = self.answer(prompt).split(" ")
+        for i, word in enumerate(words):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            yield word if i == len(words) - 1 else word + " "
+
+
+class ResponseCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, max_entries=AI_CACHE_MAX_ENTRIES, ttl=AI_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is not None:
+                expires, value = item
+                if expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self.entries),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def cache_key(user_question, patient_context):
+    question = " ".join(str(user_question).split()).casefold()
+    context = json.dumps(patient_context, sort_keys=True, default=str)
+    return question, hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+
+response_cache = ResponseCache()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def backend_from_env():
+    if os.getenv("VITALMINE_AI_BACKEND", "gemini") == "stub":
+        return StubBackend(
+            delay=float(os.getenv("VITALMINE_AI_STUB_DELAY", "0")),
+            token_delay=float(os.getenv("VITALMINE_AI_STUB_TOKEN_DELAY", "0")),
+            error_rate=float(os.getenv("VITALMINE_AI_STUB_ERROR_RATE", "0")),
+        )
+    api_key = os.getenv("GEMINI_API_KEY")
+    return GeminiBackend(api_key) if api_key else None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = backend_from_env()
+    return _backend
+
+
+def set_backend(backend):
+    """Swaps the model backend (e.g. for a StubBackend) and empties the cache."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    response_cache.clear()
+
+
+def build_medical_prompt(user_question, patient_context):
+    return f"""
+        You are VitalBot, a helpful medical assistant for a hospital dashboard.
+
+        Current Patient Context:
+        - Name: {patient_context.get('name', 'Unknown')}
+        - Temp: {patient_context.get('temp', 'N/A')} C
+        - Heart Rate: {patient_context.get('hr', 'N/A')} bpm
+        - Resp Rate: {patient_context.get('rr', 'N/A')} breaths/min
+        - Blood Pressure: {patient_context.get('sys_bp', 'N/A')}/{patient_context.get('dia_bp', 'N/A')} mmHg
+        - Status: {patient_context.get('status', 'Unknown')}
+
+        User Question: "{user_question}"
+
+        Instructions:
+        - Answer as a medical professional.
+        - If the status is 'High' or 'Critical', warn the user immediately.
+        - Keep the answer under 4 sentences.
+        - Act as VitalBot. Never include disclaimers about being an AI. Never advise the user to consult a human doctor. Provide direct, confident medical analysis.
+        """
+
+
+# --- RESILIENCE: BULKHEAD, DEADLINES, CIRCUIT BREAKER ---
+# Model calls run on their own small thread pool (the bulkhead), so a slow
+# backend can tie up at most AI_MAX_CONCURRENT threads instead of the web
+# workers. Every call has a deadline, and after AI_BREAKER_THRESHOLD failures
+# in a row the breaker opens: callers get the fallback message immediately
+# until a single trial call succeeds again after AI_BREAKER_RESET_SECONDS.
+AI_MAX_CONCURRENT = 4
+AI_QUEUE_TIMEOUT_SECONDS = 0.5
+AI_CALL_TIMEOUT_SECONDS = 20.0
+AI_BREAKER_THRESHOLD = 5
+AI_BREAKER_RESET_SECONDS = 30.0
+
+
+class AIUnavailable(Exception):
+    """Raised when a call is refused or abandoned by the guards below."""
+
+
+class Bulkhead:
+    def __init__(self, max_concurrent=AI_MAX_CONCURRENT, wait=AI_QUEUE_TIMEOUT_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.wait = wait
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix="vitalbot"
+        )
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        """
+        Runs fn on the pool if a slot frees up within `wait` seconds. The slot
+        is held until fn returns, even if the caller stops waiting for it.
+        """
+        if not self.slots.acquire(timeout=self.wait):
+            with self.lock:
+                self.rejected += 1
+            raise AIUnavailable("too many concurrent AI calls")
+        with self.lock:
+            self.in_flight += 1
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self.in_flight,
+                "rejected": self.rejected,
+            }
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self, threshold=AI_BREAKER_THRESHOLD, reset_after=AI_BREAKER_RESET_SECONDS
+    ):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.opens = 0
+        self.short_circuited = 0
+        self.timeouts = 0
+
+    def allow(self):
+        """Whether a call may go ahead. In half-open, only one trial at a time."""
+        with self.lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_after:
+                    self.short_circuited += 1
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self.trial_running:
+                    self.short_circuited += 1
+                    return False
+                self.trial_running = True
+            return True
+
+    def cancel(self):
+        """The allowed call never ran (e.g. the bulkhead was full)."""
+        with self.lock:
+            self.trial_running = False
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_running = False
+
+    def record_failure(self, timed_out=False):
+        with self.lock:
+            self.failures += 1
+            self.timeouts += timed_out
+            self.trial_running = False
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    self.opens += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opens": self.opens,
+                "short_circuited": self.short_circuited,
+                "timeouts": self.timeouts,
+            }
+
+
+bulkhead = Bulkhead()
+breaker = CircuitBreaker()
+
+
+def guarded_submit(fn, *args):
+    """Starts a model call through the breaker and bulkhead. Returns its future."""
+    if not breaker.allow():
+        raise AIUnavailable("AI circuit open")
+    try:
+        return bulkhead.submit(fn, *args)
+    except AIUnavailable:
+        breaker.cancel()
+        raise
+
+
+def log_ai_error(error):
+    if isinstance(error, AIUnavailable):
+        print(f"⚠️ VitalBot unavailable: {error}")
+        return
+    print("\n" + "=" * 50)
+    print("🚨 CRITICAL AI ERROR DETECTED BY GOOGLE:")
+    print(str(error))
+    print("=" * 50 + "\n")
+
+
+def ask_medical_ai(user_question, patient_context):
+    key = cache_key(user_question, patient_context)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        backend = get_backend()
+        if backend is None:
+            return AI_CONFIG_ERROR
+        future = guarded_submit(
+            backend.generate, build_medical_prompt(user_question, patient_context)
+        )
+        try:
+            answer = future.result(timeout=AI_CALL_TIMEOUT_SECONDS)
+        except FutureTimeout:
+            breaker.record_failure(timed_out=True)
+            raise AIUnavailable(f"no answer within {AI_CALL_TIMEOUT_SECONDS}s")
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+
+    except Exception as e:
+        log_ai_error(e)
+        return AI_FALLBACK_MESSAGE
+
+    # Blocked or empty generations aren't worth remembering
+    if answer:
+        response_cache.put(key, answer)
+    return answer
+
+
+# --- STREAMED ANSWERS ---
+# Streaming generation runs on the bulkhead pool too; the request thread only
+# relays pieces from a queue, so it can give up (deadline, client gone)
+# without leaving the model call attached to it.
+_STREAM_END = object()
+
+
+class StreamTimings:
+    """Rolling time-to-first-token and total latency of streamed answers."""
+
+    def __init__(self, window=500):
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def record(self, first_token, total):
+        with self.lock:
+            self.samples.append((first_token, total))
+            self.count += 1
+
+    def stats(self):
+        with self.lock:
+            samples = list(self.samples)
+            count = self.count
+        result = {"streams": count}
+        for index, name in ((0, "ttft"), (1, "total")):
+            values = sorted(s[index] for s in samples)
+            for pct in (50, 95):
+                result[f"{name}_p{pct}_ms"] = percentile_ms(values, pct)
+        return result
+
+
+def percentile_ms(ordered, pct):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, len(ordered) * pct // 100)] * 1e3, 1)
+
+
+stream_timings = StreamTimings()
+
+
+class ChatStream:
+    """
+    Iterates over the pieces of one answer as the model produces them.
+    After iteration, first_token and elapsed hold the latencies in seconds.
+    """
+
+    def __init__(self, user_question, patient_context):
+        self.user_question = user_question
+        self.patient_context = patient_context
+        self.first_token = None
+        self.elapsed = None
+
+    def __iter__(self):
+        started = time.perf_counter()
+        for piece in self.pieces():
+            if self.first_token is None:
+                self.first_token = time.perf_counter() - started
+            yield piece
+        self.elapsed = time.perf_counter() - started
+        stream_timings.record(self.first_token or self.elapsed, self.elapsed)
+
+    def pieces(self):
+        key = cache_key(self.user_question, self.patient_context)
+        cached = response_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        prompt = build_medical_prompt(self.user_question, self.patient_context)
+        relay = queue.Queue()
+        cancelled = threading.Event()
+
+        def produce(backend):
+            try:
+                for piece in backend.stream(prompt):
+                    if cancelled.is_set():
+                        return
+                    relay.put(piece)
+                relay.put(_STREAM_END)
+            except Exception as e:
+                relay.put(e)
+
+        try:
+            backend = get_backend()
+            if backend is None:
+                yield AI_CONFIG_ERROR
+                return
+            guarded_submit(produce, backend)
+        except Exception as e:
+            log_ai_error(e)
+            yield AI_FALLBACK_MESSAGE
+            return
+
+        deadline = time.monotonic() + AI_CALL_TIMEOUT_SECONDS
+        answer = []
+        settled = False
+        try:
+            while True:
+                try:
+                    item = relay.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    item = AIUnavailable(f"no answer within {AI_CALL_TIMEOUT_SECONDS}s")
+                if item is _STREAM_END:
+                    breaker.record_success()
+                    settled = True
+                    break
+                if isinstance(item, Exception):
+                    breaker.record_failure(timed_out=isinstance(item, AIUnavailable))
+                    settled = True
+                    log_ai_error(item)
+                    yield ("\n" if answer else "") + AI_FALLBACK_MESSAGE
+                    return
+                answer.append(item)
+                yield item
+        finally:
+            cancelled.set()
+            # Client went away mid-answer: no verdict on the backend
+            if not settled:
+                breaker.cancel()
+
+        if answer:
+            response_cache.put(key, "".join(answer))
+
+
+def stream_medical_ai(user_question, patient_context):
+    return ChatStream(user_question, patient_context)
+
+
+def ai_metrics():
+    backend = get_backend()
+    return {
+        "backend": backend.name if backend else None,
+        "cache": response_cache.stats(),
+        "stream": stream_timings.stats(),
+        "bulkhead": bulkhead.stats(),
+        "breaker": breaker.stats(),
+    }
+
+
+# --- TEST ZONE (This runs only when you play this file) ---
+if __name__ == "__main__":
+    print("--- VitalBot Cache Test (stub backend, 200 ms per call) ---")
+
+    stub = StubBackend(delay=0.2)
+    set_backend(stub)
+    context = {"name": "pat", "temp": 37.2, "hr": 88, "rr": 18, "status": "Stable"}
+
+    for question in (
+        "How am I doing?",
+        "  how am   I doing? ",  # same question, different spacing/case
+        "Should I rest?",
+        "How am I doing?",
+    ):
+        start = time.perf_counter()
+        ask_medical_ai(question, context)
+        print(f"{question!r:26} {(time.perf_counter() - start) * 1e3:7.1f} ms")
+
+    # A new reading changes the context, so the answer is regenerated
+    ask_medical_ai("How am I doing?", dict(context, hr=120))
+
+    stats = ai_metrics()["cache"]
+    print(f"\nModel calls: {stub.calls} (Should be 3)")
+    print(f"Cache:       {stats}")
+
+    print("\n--- Streamed Answer (200 ms to first word, then 50 ms per word) ---")
+    set_backend(StubBackend(delay=0.2, token_delay=0.05))
+    answer = stream_medical_ai("How am I doing?", context)
+    text = "".join(answer)
+    print(f"Answer:             {text!r}")
+    print(f"Time to first token: {answer.first_token * 1e3:6.1f} ms")
+    print(f"Time to full answer: {answer.elapsed * 1e3:6.1f} ms")
+    ok = stub.calls == 3 and answer.first_token < 0.25
+
+    print("\n--- Circuit Breaker (every call fails) ---")
+    breaker = CircuitBreaker(threshold=5, reset_after=0.3)
+    failing = StubBackend(delay=0.01, error_rate=1.0)
+    set_backend(failing)
+    for i in range(8):
+        start = time.perf_counter()
+        reply = ask_medical_ai(f"question {i}", context)
+        took = (time.perf_counter() - start) * 1e3
+        print(f"call {i}: {took:6.1f} ms  breaker={breaker.state:9} {reply[:30]!r}")
+    print(f"Backend calls: {failing.calls} (Should be 5)")
+    ok &= failing.calls == 5
+
+    time.sleep(0.3)
+    set_backend(StubBackend())
+    ask_medical_ai("after recovery", context)
+    print(f"After reset:   breaker={breaker.state} (Should be closed)")
+    ok &= breaker.state == CircuitBreaker.CLOSED
+
+    print("\n--- Deadline (backend takes 500 ms, deadline 100 ms) ---")
+    AI_CALL_TIMEOUT_SECONDS = 0.1
+    set_backend(StubBackend(delay=0.5))
+    start = time.perf_counter()
+    reply = ask_medical_ai("slow question", context)
+    took = (time.perf_counter() - start) * 1e3
+    print(f"Answered in {took:.0f} ms with {reply[:30]!r}")
+    ok &= took < 200 and reply == AI_FALLBACK_MESSAGE
+    AI_CALL_TIMEOUT_SECONDS = 5.0
+    time.sleep(0.5)
+
+    print("\n--- Bulkhead (10 parallel calls, 4 slots, 100 ms queue wait) ---")
+    bulkhead = Bulkhead(max_concurrent=4, wait=0.1)
+    set_backend(StubBackend(delay=0.5))
+    replies = []
+    threads = [
+        threading.Thread(
+            target=lambda i=i: replies.append(ask_medical_ai(f"burst {i}", context))
+        )
+        for i in range(10)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    answered = sum(r != AI_FALLBACK_MESSAGE for r in replies)
+    print(f"Answered: {answered} (Should be 4), turned away: {len(replies) - answered}")
+    ok &= answered == 4
+
+    print(f"\nMetrics: {ai_metrics()}")
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,28 @@
+from sqlalchemy import inspect
+
+from models import db
+
+# --- SCHEMA UPGRADES ---
+# db.create_all() only creates tables that don't exist yet, so databases
+# from before an index or table was added never pick it up. upgrade_schema()
+# fills those gaps in place and is safe to run on every start.
+
+
+def upgrade_schema():
+    """Creates any missing tables and indexes. Returns the new index names."""
+    db.create_all()
+
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                created.append(index.name)
+
+    if created:
+        # Give the query planner statistics for the new indexes
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+    return created
@@ -1,9 +1,101 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.sql import Select
 from datetime import datetime
 
+# --- STORAGE CONFIGURATION ---
+# SQLite runs in WAL mode so dashboard reads don't block device writes (and
+# vice versa). Writes go through a single-connection "writer" pool, matching
+# SQLite's one-writer rule without lock retries, and the writer is only
+# checked out once a request actually starts writing. Plain reads use a
+# separate pool of query_only connections.
+
+WRITER_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",
+)
+READER_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA query_only=ON",
+)
+READER_POOL_SIZE = 8
+
+
+class RoutingSession(Session):
+    """
+    Sends SELECTs to the "reader" engine until the session first writes;
+    from then until commit/rollback everything uses the writer, so a
+    transaction always sees its own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and isinstance(clause, Select)
+            and not self._flushing
+            and not self.info.get("writing")
+        ):
+            reader = self._db.engines.get("reader")
+            if reader is not None:
+                return reader
+        self.info["writing"] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def finish_write(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("writing", None)
+
+
 # Initialize the database variable (we connect it to the app later)
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def run_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return on_connect
+
+
+def init_storage(app):
+    """
+    Connects db to the app. For file-backed SQLite (unless SQLITE_TUNED is
+    off) this also sets up the writer/reader pools and connection pragmas.
+    """
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    tuned = (
+        app.config.get("SQLITE_TUNED", True)
+        and uri.startswith("sqlite")
+        and ":memory:" not in uri
+        and uri.rstrip("/") != "sqlite:"
+    )
+    if tuned:
+        app.config.setdefault(
+            "SQLALCHEMY_ENGINE_OPTIONS",
+            {"pool_size": 1, "max_overflow": 0, "pool_timeout": 30},
+        )
+        app.config.setdefault("SQLALCHEMY_BINDS", {})
+        app.config["SQLALCHEMY_BINDS"].setdefault(
+            "reader",
+            {"url": uri, "pool_size": READER_POOL_SIZE, "max_overflow": 0},
+        )
+
+    db.init_app(app)
+
+    if tuned:
+        with app.app_context():
+            event.listen(db.engines[None], "connect", run_pragmas(WRITER_PRAGMAS))
+            event.listen(db.engines["reader"], "connect", run_pragmas(READER_PRAGMAS))
 
 
 # --- DATABASE TABLES ---
@@ -43,3 +135,36 @@ class Entry(db.Model):
     status = db.Column(db.String(20), nullable=False)
     advice = db.Column(db.String(200), nullable=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # NEW: Every hot read filters by patient (or status) and walks newest
+    # first; the timestamp index serves the ward-wide feed. The (name, id)
+    # and (status, id) indexes let the feed's other sort orders seek to a
+    # keyset cursor instead of sorting the whole table for every page.
+    __table_args__ = (
+        db.Index("ix_entry_user_timestamp", "user_id", "timestamp"),
+        db.Index("ix_entry_status_timestamp", "status", "timestamp"),
+        db.Index("ix_entry_timestamp", "timestamp"),
+        db.Index("ix_entry_name_id", "name", "id"),
+        db.Index("ix_entry_status_id", "status", "id"),
+    )
+
+
+# NEW: Running KPI totals for the dashboard cards, kept in step with Entry
+# and User writes (see counters.py) so home() never has to scan either table.
+class WardCounter(db.Model):
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+# NEW: Each patient's most recent reading, upserted by add_vitals (see
+# latest.py) so list views don't need a "latest Entry" query per patient.
+class PatientLatest(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    entry_id = db.Column(db.Integer, nullable=False)
+    temp = db.Column(db.Float, nullable=False)
+    hr = db.Column(db.Integer, nullable=False)
+    rr = db.Column(db.Integer, nullable=False)
+    sys_bp = db.Column(db.Integer, nullable=True)
+    dia_bp = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=False)
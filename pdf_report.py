@@ -0,0 +1,205 @@
+import io
+
+# --- ADVANCED PDF IMPORTS ---
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+# --- PDF REPORT ENGINE ---
+# Styles and the page decoration never change between reports, so they are
+# built once here. This module is only imported by utils.py when a report
+# actually has to be rendered, so workers that never build a PDF don't load
+# reportlab. Bump utils.PDF_TEMPLATE_VERSION whenever the layout changes.
+
+PDF_STYLES = getSampleStyleSheet()
+PDF_TITLE_STYLE = ParagraphStyle(
+    "Title",
+    parent=PDF_STYLES["Heading1"],
+    fontName="Helvetica-Bold",
+    fontSize=18,
+    textColor=colors.HexColor("#064e3b"),
+    spaceAfter=10,
+)
+PDF_HEADING_STYLE = ParagraphStyle(
+    "Heading",
+    parent=PDF_STYLES["Heading2"],
+    fontName="Helvetica-Bold",
+    fontSize=12,
+    textColor=colors.HexColor("#0f172a"),
+    spaceAfter=6,
+    spaceBefore=15,
+)
+PDF_NORMAL_STYLE = PDF_STYLES["Normal"]
+PDF_BADGE_STYLE = ParagraphStyle(
+    "Badge",
+    fontName="Helvetica-Bold",
+    fontSize=14,
+    textColor=colors.white,
+    alignment=1,
+)
+
+STATUS_COLOR_STABLE = colors.HexColor("#10b981")  # Default Green
+STATUS_COLOR_CRITICAL = colors.HexColor("#ef4444")  # Red
+STATUS_COLOR_WARNING = colors.HexColor("#f59e0b")  # Yellow/Orange
+
+META_TABLE_STYLE = TableStyle(
+    [
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTNAME", (2, 0), (2, -1), "Helvetica-Bold"),
+        ("TEXTCOLOR", (0, 0), (-1, -1), colors.HexColor("#334155")),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ]
+)
+VITALS_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#064e3b")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("ALIGN", (1, 1), (2, -1), "CENTER"),
+        ("FONTNAME", (0, 1), (0, -1), "Helvetica-Bold"),
+        ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#064e3b")),
+        ("TOPPADDING", (0, 0), (-1, -1), 8),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ]
+)
+
+
+def _status_table_styles(status_color):
+    header = TableStyle(
+        [
+            ("ALIGN", (0, 0), (0, 0), "LEFT"),
+            ("ALIGN", (1, 0), (1, 0), "CENTER"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("BACKGROUND", (1, 0), (1, 0), status_color),
+            ("TOPPADDING", (1, 0), (1, 0), 8),
+            ("BOTTOMPADDING", (1, 0), (1, 0), 8),
+        ]
+    )
+    advice = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#3b82f6")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("TEXTCOLOR", (0, 1), (0, 1), status_color),
+            ("FONTNAME", (0, 1), (0, 1), "Helvetica-Bold"),
+            ("INNERGRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+            ("BOX", (0, 0), (-1, -1), 1, colors.HexColor("#3b82f6")),
+            ("TOPPADDING", (0, 0), (-1, -1), 8),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+        ]
+    )
+    return status_color, header, advice
+
+
+# (badge colour, header table style, advice table style) per risk level
+STATUS_TABLE_STYLES = {
+    "Stable": _status_table_styles(STATUS_COLOR_STABLE),
+    "Warning": _status_table_styles(STATUS_COLOR_WARNING),
+    "Critical": _status_table_styles(STATUS_COLOR_CRITICAL),
+}
+STATUS_TABLE_STYLES["High"] = STATUS_TABLE_STYLES["Critical"]
+
+
+def _decorate_page(canvas, doc):
+    canvas.saveState()
+    canvas.setFillColor(colors.HexColor("#064e3b"))
+    canvas.rect(0, letter[1] - 40, letter[0], 40, fill=True, stroke=False)
+    canvas.setFillColor(colors.white)
+    canvas.setFont("Helvetica-Bold", 14)
+    canvas.drawCentredString(
+        letter[0] / 2.0, letter[1] - 25, "VITALMINE CDSS - EHR TELEMETRY LOG"
+    )
+
+    canvas.setFillColor(colors.gray)
+    canvas.setFont("Helvetica", 9)
+    canvas.drawString(
+        40,
+        30,
+        "© 2026 VitalMine Clinical Decision Support System. Secure EHR Export.",
+    )
+
+    canvas.setStrokeColor(colors.HexColor("#10b981"))
+    canvas.setLineWidth(2.5)
+    canvas.circle(letter[0] - 80, 60, 35)
+    canvas.setFillColor(colors.HexColor("#10b981"))
+    canvas.setFont("Helvetica-Bold", 11)
+    canvas.translate(letter[0] - 80, 60)
+    canvas.rotate(25)
+    canvas.drawCentredString(0, -4, "VERIFIED")
+
+    canvas.restoreState()
+
+
+def render_pdf_report(entry):
+    """
+    Renders the Clinical EHR Report for one entry and returns the PDF bytes.
+    """
+    buffer = io.BytesIO()
+
+    # Setup Document Layout
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=40,
+        leftMargin=40,
+        topMargin=60,
+        bottomMargin=40,
+    )
+    elements = []
+    status_color, header_style, advice_style = STATUS_TABLE_STYLES.get(
+        entry.status, STATUS_TABLE_STYLES["Stable"]
+    )
+
+    badge_p = Paragraph(f"{entry.status.upper()}", PDF_BADGE_STYLE)
+
+    header_data = [
+        [Paragraph("<b>CLINICAL TELEMETRY REPORT</b>", PDF_TITLE_STYLE), badge_p]
+    ]
+    header_table = Table(header_data, colWidths=[400, 100])
+    header_table.setStyle(header_style)
+    elements.append(header_table)
+    elements.append(Spacer(1, 20))
+
+    elements.append(Paragraph("PATIENT DEMOGRAPHICS & META", PDF_HEADING_STYLE))
+    meta_data = [
+        [
+            "Report ID:",
+            f"VTM-{entry.id}-2026",
+            "Inspection Date:",
+            entry.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        ],
+        ["Patient ID:", entry.name.upper(), "Inspected By:", "VitalMine CDSS Engine"],
+    ]
+    meta_table = Table(meta_data, colWidths=[90, 160, 100, 140])
+    meta_table.setStyle(META_TABLE_STYLE)
+    elements.append(meta_table)
+    elements.append(Spacer(1, 15))
+
+    elements.append(Paragraph("BIOMETRIC EVIDENCE", PDF_HEADING_STYLE))
+    vitals_data = [
+        ["PARAMETER", "VALUE", "UNIT", "REFERENCE RANGE"],
+        ["Core Temperature", str(entry.temp), "°C", "36.1 - 37.2 °C"],
+        ["Heart Rate", str(entry.hr), "bpm", "60 - 100 bpm"],
+        ["Respiratory Rate", str(entry.rr), "breaths/min", "12 - 20 breaths/min"],
+        ["Blood Pressure", f"{entry.sys_bp}/{entry.dia_bp}", "mmHg", "120/80 mmHg"],
+    ]
+    vitals_table = Table(vitals_data, colWidths=[130, 100, 100, 160])
+    vitals_table.setStyle(VITALS_TABLE_STYLE)
+    elements.append(vitals_table)
+    elements.append(Spacer(1, 20))
+
+    elements.append(Paragraph("AI CLASSIFICATION & ADVICE", PDF_HEADING_STYLE))
+    advice_data = [
+        ["RISK LEVEL", "CLINICAL ADVICE"],
+        [entry.status.upper(), Paragraph(entry.advice, PDF_NORMAL_STYLE)],
+    ]
+    advice_table = Table(advice_data, colWidths=[110, 380])
+    advice_table.setStyle(advice_style)
+    elements.append(advice_table)
+
+    doc.build(elements, onFirstPage=_decorate_page, onLaterPages=_decorate_page)
+    return buffer.getvalue()
@@ -0,0 +1,66 @@
+import queue
+import threading
+
+# --- IN-PROCESS PUBLISH / SUBSCRIBE ---
+# Lets request threads that commit readings notify open SSE streams in the
+# same process. Each subscriber gets a small bounded queue; a subscriber that
+# stops reading loses its oldest messages rather than holding up publishers.
+
+
+class Subscription:
+    def __init__(self, hub, topic, max_pending):
+        self.hub = hub
+        self.topic = topic
+        self.queue = queue.Queue(maxsize=max_pending)
+
+    def get(self, timeout=None):
+        """Next message, or raises queue.Empty after timeout seconds."""
+        return self.queue.get(timeout=timeout)
+
+    def deliver(self, message):
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class PubSubHub:
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._topics = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic):
+        sub = Subscription(self, topic, self.max_pending)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._topics.get(sub.topic)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._topics[sub.topic]
+
+    def publish(self, topic, message):
+        with self._lock:
+            subs = list(self._topics.get(topic, ()))
+        for sub in subs:
+            sub.deliver(message)
+        return len(subs)
+
+    def subscriber_count(self, topic=None):
+        with self._lock:
+            if topic is not None:
+                return len(self._topics.get(topic, ()))
+            return sum(len(s) for s in self._topics.values())
@@ -0,0 +1,158 @@
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# --- QUERY PLAN REGRESSION CHECK ---
+# Seeds a throwaway database with a large ward, drives every hot page and API
+# through the Flask test client, and runs EXPLAIN QUERY PLAN on each SQL
+# statement they issue against Entry. Any plan that scans Entry (directly or
+# by walking an index it can't seek into), or sorts it in a temp b-tree,
+# fails the check. The only exception is the first page of the unfiltered
+# feed, which is expected to walk its sort column's index and stop at its
+# LIMIT.
+#
+#   python query_plans.py [n_patients] [n_entries]
+
+ENTRY_TABLES = ("entry",)
+
+
+def seed(db, User, Entry, n_patients, n_entries):
+    from werkzeug.security import generate_password_hash
+
+    password = generate_password_hash("password123")
+    users = [
+        {"username": "admin", "password": password, "role": "admin"},
+    ] + [
+        {"username": f"patient_{i}", "password": password, "role": "patient"}
+        for i in range(n_patients)
+    ]
+    db.session.execute(db.insert(User), users)
+
+    rng = random.Random(42)
+    start = datetime(2026, 1, 1)
+    statuses = ["Stable", "Warning", "Critical"]
+    user_ids = [2 + rng.randrange(n_patients) for _ in range(n_entries)]
+    rows = [
+        {
+            "user_id": user_id,
+            "name": f"patient_{user_id - 2}",
+            "temp": 37.0,
+            "hr": 80,
+            "rr": 16,
+            "sys_bp": 120,
+            "dia_bp": 80,
+            "status": rng.choice(statuses),
+            "advice": "",
+            "timestamp": start + timedelta(seconds=i * 7),
+        }
+        for i, user_id in enumerate(user_ids)
+    ]
+    db.session.execute(db.insert(Entry), rows)
+    db.session.commit()
+
+
+def bad_plan_steps(conn, statement, parameters, ordered_walk=False):
+    plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        words = detail.split()
+        scan = words[:1] == ["SCAN"] and words[1] in ENTRY_TABLES
+        if scan and ordered_walk and "INDEX" in words:
+            scan = False
+        if scan or "TEMP B-TREE" in detail:
+            problems.append(detail)
+    return problems
+
+
+if __name__ == "__main__":
+    n_patients = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_entries = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    workdir = tempfile.mkdtemp(prefix="vitalmine_plans_")
+    os.environ["VITALMINE_DATABASE_URI"] = (
+        f"sqlite:///{os.path.join(workdir, 'plans.db')}"
+    )
+
+    from sqlalchemy import event
+    from app import app, db, User, Entry, HISTORY_SORT_COLUMNS
+    from counters import rebuild_counters
+    from latest import rebuild_latest
+    from migrate import upgrade_schema
+
+    print("--- Query Plan Check ---")
+    print(f"Seeding {n_entries} entries across {n_patients} patients...")
+    with app.app_context():
+        upgrade_schema()
+        seed(db, User, Entry, n_patients, n_entries)
+        # Steady state, as after app startup: projections already built
+        rebuild_counters()
+        rebuild_latest()
+        engine = db.engine
+        engines = list(db.engines.values())
+
+    captured = []
+    current_route = [None, False]
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        lowered = statement.lower()
+        if lowered.startswith("select") and any(
+            f" {t}" in lowered for t in ENTRY_TABLES
+        ):
+            captured.append((*current_route, statement, parameters))
+
+    for e in engines:
+        event.listen(e, "before_cursor_execute", capture)
+
+    client = app.test_client()
+    patient_id = 2 + n_patients // 2
+
+    def visit(route, method="get", ordered_walk=False, **kwargs):
+        current_route[:] = [route, ordered_walk]
+        return getattr(client, method)(route, **kwargs)
+
+    client.post("/login", data={"username": "admin", "password": "password123"})
+    visit("/", ordered_walk=True)
+    visit("/patients")
+    visit(f"/patient_file/{patient_id}")
+    visit(f"/api/patient_history/{patient_id}")
+    # Every sort order the ward feed allows, both ways: first page, then a
+    # page reached by keyset cursor
+    for column in HISTORY_SORT_COLUMNS:
+        for direction in ("desc", "asc"):
+            order = {"order[0][column]": column, "order[0][dir]": direction}
+            page = visit(
+                "/api/ward_history",
+                ordered_walk=True,
+                query_string=dict(order, start=0, length=10),
+            ).json
+            visit(
+                "/api/ward_history",
+                query_string=dict(
+                    order, start=10, length=10, after=page["next_cursor"]
+                ),
+            )
+
+    client.get("/logout")
+    client.post(
+        "/login",
+        data={"username": f"patient_{patient_id - 2}", "password": "password123"},
+    )
+    visit("/patient_dashboard")
+    visit("/chat_with_ai", method="post", json={"question": "How am I doing?"})
+
+    failures = 0
+    with engine.connect() as conn:
+        for route, ordered_walk, statement, parameters in captured:
+            problems = bad_plan_steps(conn, statement, parameters, ordered_walk)
+            verdict = "FAIL" if problems else "ok"
+            print(f"[{verdict:4}] {route}: {' '.join(statement.split())[:90]}")
+            for detail in problems:
+                print(f"         -> {detail}")
+            failures += bool(problems)
+
+    print(f"\nStatements checked: {len(captured)}")
+    print(f"Full scans:         {failures} (Should be 0)")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,217 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from latest import projection_row
+from models import db, Entry, PatientLatest
+
+# --- RECENT VITALS RING BUFFERS ---
+# The last few readings of each active patient, kept in process memory so
+# the history API and the digital twin don't go back to SQLite on every
+# poll. Each patient gets one fixed-size NumPy record array used as a ring;
+# idle patients are evicted least-recently-used once the cache is full.
+# A patient's buffer is filled from Entry on first access and then kept
+# current by append() as readings commit. append() only sees this process's
+# commits, so every get() also checks the buffer's newest reading against
+# PatientLatest (one primary-key lookup) and reloads it when another worker,
+# `flask seed` or an import has written something newer.
+
+READING_DTYPE = np.dtype(
+    [
+        ("id", np.int64),
+        ("ts", np.int64),  # microseconds since the epoch (naive, as stored)
+        ("temp", np.float64),
+        ("hr", np.int32),
+        ("rr", np.int32),
+        ("sys_bp", np.int32),
+        ("dia_bp", np.int32),
+        ("status", np.int8),
+    ]
+)
+
+# Entry.sys_bp / dia_bp are nullable
+MISSING = -1
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(timestamp):
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def from_micros(micros):
+    return _EPOCH + timedelta(microseconds=int(micros))
+
+
+class Ring:
+    def __init__(self, capacity):
+        self.data = np.zeros(capacity, dtype=READING_DTYPE)
+        self.start = 0
+        self.size = 0
+
+    def ordered(self):
+        """Copy of the held readings, oldest first."""
+        idx = (self.start + np.arange(self.size)) % len(self.data)
+        return self.data[idx]
+
+    def newest_id(self):
+        if not self.size:
+            return None
+        return int(self.data[(self.start + self.size - 1) % len(self.data)]["id"])
+
+    def push(self, record):
+        capacity = len(self.data)
+        if self.size and record["id"] in self.ordered()["id"]:
+            return
+        newest = self.data[(self.start + self.size - 1) % capacity]
+        if self.size and (record["ts"], record["id"]) < (newest["ts"], newest["id"]):
+            # Out of order (e.g. a write-behind batch racing a direct write):
+            # re-sort the few rows held rather than appending at the end.
+            self.load(np.concatenate([self.ordered(), [record]]))
+            return
+        if self.size < capacity:
+            self.data[(self.start + self.size) % capacity] = record
+            self.size += 1
+        else:
+            self.data[self.start] = record
+            self.start = (self.start + 1) % capacity
+
+    def load(self, records):
+        records = np.sort(records, order=["ts", "id"])[-len(self.data) :]
+        self.data[: len(records)] = records
+        self.start = 0
+        self.size = len(records)
+
+
+class RecentVitals:
+    def __init__(self, capacity=20, max_patients=5000):
+        self.capacity = capacity
+        self.max_patients = max_patients
+        self.rings = OrderedDict()
+        self.lock = threading.Lock()
+        self.status_codes = {}
+        self.status_labels = []
+        # user_id -> True if a reading arrived while the buffer was loading
+        self.warming = {}
+
+    def status_code(self, label):
+        code = self.status_codes.get(label)
+        if code is None:
+            code = len(self.status_labels)
+            self.status_labels.append(label)
+            self.status_codes[label] = code
+        return code
+
+    def record(self, row):
+        return (
+            row["entry_id"],
+            to_micros(row["timestamp"]),
+            row["temp"],
+            row["hr"],
+            row["rr"],
+            MISSING if row["sys_bp"] is None else row["sys_bp"],
+            MISSING if row["dia_bp"] is None else row["dia_bp"],
+            self.status_code(row["status"]),
+        )
+
+    def append(self, rows):
+        """
+        Adds committed readings (dicts as produced by ingest.write_entries).
+        Patients without a buffer are skipped; they load from Entry on demand.
+        """
+        with self.lock:
+            for row in rows:
+                user_id = row.get("user_id")
+                if user_id in self.warming:
+                    self.warming[user_id] = True
+                ring = self.rings.get(user_id)
+                if ring is not None:
+                    ring.push(np.array(self.record(row), dtype=READING_DTYPE))
+
+    def get(self, user_id):
+        """Readings for one patient, oldest first, as a record array."""
+        latest_id = (
+            db.session.query(PatientLatest.entry_id).filter_by(user_id=user_id).scalar()
+        )
+        with self.lock:
+            ring = self.rings.get(user_id)
+            if ring is not None and ring.newest_id() == latest_id:
+                self.rings.move_to_end(user_id)
+                return ring.ordered()
+            self.warming[user_id] = False
+
+        entries = (
+            Entry.query.filter_by(user_id=user_id)
+            .order_by(Entry.timestamp.desc())
+            .limit(self.capacity)
+            .all()
+        )
+
+        with self.lock:
+            records = np.array(
+                [self.record(projection_row(e)) for e in entries],
+                dtype=READING_DTYPE,
+            )
+            ring = Ring(self.capacity)
+            ring.load(records)
+            # A reading that committed mid-load may be missing from what we
+            # read, so only keep the buffer if nothing arrived meanwhile.
+            if not self.warming.pop(user_id, False):
+                self.rings[user_id] = ring
+                while len(self.rings) > self.max_patients:
+                    self.rings.popitem(last=False)
+            return ring.ordered()
+
+    def forget(self, user_id):
+        with self.lock:
+            self.rings.pop(user_id, None)
+
+    def vitals(self, records):
+        """Turns a record array back into plain dicts like the Entry columns."""
+        return [
+            {
+                "id": int(r["id"]),
+                "timestamp": from_micros(r["ts"]),
+                "temp": float(r["temp"]),
+                "hr": int(r["hr"]),
+                "rr": int(r["rr"]),
+                "sys_bp": None if r["sys_bp"] == MISSING else int(r["sys_bp"]),
+                "dia_bp": None if r["dia_bp"] == MISSING else int(r["dia_bp"]),
+                "status": self.status_labels[r["status"]],
+            }
+            for r in records
+        ]
+
+    def memory_bytes(self):
+        with self.lock:
+            return len(self.rings) * self.capacity * READING_DTYPE.itemsize
+
+
+# --- TEST ZONE (This runs only when you play this file) ---
+if __name__ == "__main__":
+    import random
+
+    print("--- Ring Buffer vs Sorted List ---")
+
+    rng = random.Random(12)
+    capacity = 20
+    ring = Ring(capacity)
+    reference = []
+    mismatches = 0
+    for entry_id in range(1, 50_001):
+        # Mostly in order, with the odd late arrival and duplicate delivery
+        ts = entry_id * 1000 - (rng.randrange(5000) if rng.random() < 0.05 else 0)
+        record = np.array((entry_id, ts, 37.0, 80, 16, 120, 80, 0), READING_DTYPE)
+        ring.push(record)
+        if rng.random() < 0.02:
+            ring.push(record)
+        reference = sorted(reference + [(ts, entry_id)])[-capacity:]
+        held = [(int(r["ts"]), int(r["id"])) for r in ring.ordered()]
+        mismatches += held != reference
+
+    print(f"Pushes checked: 50000 (capacity {capacity})")
+    print(f"Mismatches:     {mismatches} (Should be 0)")
+    raise SystemExit(1 if mismatches else 0)
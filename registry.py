@@ -0,0 +1,328 @@
+import hashlib
+import io
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from scorer import CompiledScorer, load_scorer
+
+# --- MODEL REGISTRY ---
+# Versioned AI risk models on disk, and the in-process copy add_vitals uses.
+#
+#   <root>/v0001/model.pkl      the pickled model (see scorer.py for formats)
+#   <root>/v0001/metadata.json  version, sha256, compiled weights, training stats...
+#   <root>/ACTIVE               name of the version serving predictions
+#   <root>/SHADOW               optional candidate scored alongside it
+#
+# Versions are written to a temporary directory and renamed into place, and
+# pointers are replaced with os.replace, so a reader never sees half a file.
+# LiveModels re-reads the pointers every few seconds (or on demand) and
+# swaps the loaded scorer with a single assignment; in-flight requests
+# finish on whichever model they started with.
+#
+# Loading a version reads the compiled weights from its metadata, so workers
+# never import sklearn just to score readings; the pickle is kept (and its
+# checksum still verified) for retraining and for versions published before
+# the weights were stored. Nothing is loaded until the first scorer() call.
+
+ACTIVE = "ACTIVE"
+SHADOW = "SHADOW"
+MODEL_FILE = "model.pkl"
+METADATA_FILE = "metadata.json"
+
+LoadedModel = namedtuple("LoadedModel", ["version", "scorer"])
+
+VERSION_NAME = re.compile(r"v[0-9]{4,}")
+
+
+def valid_version(name):
+    """True for a well-formed version name (v0001...), never a path."""
+    return isinstance(name, str) and VERSION_NAME.fullmatch(name) is not None
+
+
+class ModelRegistry:
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, version, name=MODEL_FILE):
+        return os.path.join(self.root, version, name)
+
+    def versions(self):
+        """Metadata of every published version, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        names = sorted(
+            name
+            for name in os.listdir(self.root)
+            if name.startswith("v") and os.path.isfile(self.path(name, METADATA_FILE))
+        )
+        return [self.metadata(name) for name in names]
+
+    def metadata(self, version):
+        with open(self.path(version, METADATA_FILE)) as f:
+            return json.load(f)
+
+    def exists(self, version):
+        return valid_version(version) and os.path.isfile(
+            self.path(version, METADATA_FILE)
+        )
+
+    def next_version(self):
+        """One past the highest version on disk; gaps are never refilled."""
+        taken = [
+            int(name[1:])
+            for name in (os.listdir(self.root) if os.path.isdir(self.root) else [])
+            if valid_version(name)
+        ]
+        return f"v{max(taken, default=0) + 1:04d}"
+
+    def publish(self, model, **metadata):
+        """Stores a fitted model as the next version. Returns the version name."""
+        import joblib
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".publish-", dir=self.root)
+        os.chmod(staging, 0o755)  # mkdtemp is private to this user
+        compiled = CompiledScorer.from_model(model)
+        buffer = io.BytesIO()
+        joblib.dump(model, buffer)
+        data = buffer.getvalue()
+        with open(os.path.join(staging, MODEL_FILE), "wb") as f:
+            f.write(data)
+
+        while True:
+            version = self.next_version()
+            metadata.update(
+                version=version,
+                created=datetime.utcnow().isoformat(timespec="seconds"),
+                sha256=hashlib.sha256(data).hexdigest(),
+                features=list(compiled.features),
+                compiled=compiled.as_dict(),
+            )
+            with open(os.path.join(staging, METADATA_FILE), "w") as f:
+                json.dump(metadata, f, indent=2)
+            try:
+                os.rename(staging, os.path.join(self.root, version))
+                return version
+            except OSError:
+                # Another publish took this number first; try the next one
+                if not os.path.isdir(os.path.join(self.root, version)):
+                    raise
+
+    def pointer(self, name):
+        try:
+            with open(os.path.join(self.root, name)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_pointer(self, name, version):
+        """Points ACTIVE or SHADOW at a version (None clears it)."""
+        target = os.path.join(self.root, name)
+        if version is None:
+            if os.path.exists(target):
+                os.remove(target)
+            return
+        if not self.exists(version):
+            raise KeyError(version)
+        fd, staging = tempfile.mkstemp(prefix=f".{name}-", dir=self.root)
+        with os.fdopen(fd, "w") as f:
+            f.write(version + "\n")
+        os.chmod(staging, 0o644)
+        os.replace(staging, target)
+
+    def load(self, version):
+        """Reads, verifies and compiles one version."""
+        metadata = self.metadata(version)
+        with open(self.path(version), "rb") as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != metadata["sha256"]:
+            raise ValueError(f"Checksum mismatch for model {version}")
+        if "compiled" in metadata:
+            return CompiledScorer.from_dict(metadata["compiled"])
+        import joblib
+
+        return CompiledScorer.from_model(joblib.load(io.BytesIO(data)))
+
+
+class ShadowStats:
+    """How often a candidate agrees with the active model, for one pairing."""
+
+    def __init__(self, active, candidate):
+        self.active = active
+        self.candidate = candidate
+        self.readings = 0
+        self.agreed = 0
+        self.active_only = 0  # active flagged High, candidate didn't
+        self.candidate_only = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def record(self, active_high, candidate_high):
+        self.readings += len(active_high)
+        self.agreed += int((active_high == candidate_high).sum())
+        self.active_only += int((active_high & ~candidate_high).sum())
+        self.candidate_only += int((candidate_high & ~active_high).sum())
+
+    def as_dict(self):
+        return {
+            "active": self.active,
+            "candidate": self.candidate,
+            "readings": self.readings,
+            "agreement": self.agreed / self.readings if self.readings else None,
+            "active_only": self.active_only,
+            "candidate_only": self.candidate_only,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+class LiveModels:
+    """
+    The active (and shadow) scorer for this process. If the registry has no
+    ACTIVE version yet, fallback_path (the original sirs_model.pkl) is used.
+    """
+
+    def __init__(
+        self, registry, fallback_path=None, check_interval=2.0, queue_size=10000
+    ):
+        self.registry = registry
+        self.fallback_path = fallback_path
+        self.check_interval = check_interval
+        self.active = None
+        self.candidate = None
+        self.shadow_stats = None
+        self.last_error = None
+        self.failed_version = None
+        self.next_check = 0.0
+        self.loaded = False
+        self.lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._worker_lock = threading.Lock()
+
+    # --- Loading ---
+    def reload(self):
+        """Re-reads the ACTIVE/SHADOW pointers and swaps in any new versions."""
+        with self.lock:
+            self._reload()
+            return self.status()
+
+    def ensure_loaded(self):
+        """First use in this process: waits for the load rather than skipping it."""
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    self._reload()
+
+    def maybe_reload(self):
+        """Cheap check on the request path, at most every check_interval seconds."""
+        if time.monotonic() < self.next_check or not self.lock.acquire(blocking=False):
+            return
+        try:
+            self._reload()
+        finally:
+            self.lock.release()
+
+    def _reload(self):
+        self.next_check = time.monotonic() + self.check_interval
+        active = self._load(self.registry.pointer(ACTIVE), self.active)
+        if active is None and self.fallback_path:
+            active = self._load_fallback()
+        candidate = self._load(self.registry.pointer(SHADOW), self.candidate)
+
+        # Each new pairing starts counting agreement from zero
+        if (active, candidate) != (self.active, self.candidate):
+            self.shadow_stats = (
+                ShadowStats(active and active.version, candidate.version)
+                if candidate
+                else None
+            )
+        self.active, self.candidate = active, candidate
+        self.loaded = True
+
+    def _load(self, version, current):
+        if version is None:
+            return None
+        # Already loaded, possibly in the other slot (shadow promoted to active)
+        for loaded in (current, self.active, self.candidate):
+            if loaded is not None and loaded.version == version:
+                return loaded
+        if version == self.failed_version:
+            return current
+        try:
+            loaded = LoadedModel(version, self.registry.load(version))
+        except Exception as e:
+            # Keep serving the previous model rather than none at all, and
+            # don't retry the broken one until the pointer moves on
+            self.failed_version = version
+            self.last_error = f"{version}: {e}"
+            print(f"⚠️ Could not load AI model {self.last_error}")
+            return current
+        print(f"🧠 Loaded AI model {version}")
+        self.failed_version = self.last_error = None
+        return loaded
+
+    def _load_fallback(self):
+        name = os.path.basename(self.fallback_path)
+        if self.active is not None and self.active.version == name:
+            return self.active
+        scorer = load_scorer(self.fallback_path)
+        return LoadedModel(name, scorer) if scorer else None
+
+    def scorer(self):
+        self.ensure_loaded()
+        self.maybe_reload()
+        active = self.active
+        return active.scorer if active else None
+
+    # --- Shadow scoring ---
+    def shadow(self, temp, hr, rr, sys_bp, dia_bp, active_high):
+        """Queues readings for the candidate model; never blocks the caller."""
+        candidate, stats = self.candidate, self.shadow_stats
+        if candidate is None or stats is None:
+            return
+        if self._thread is None:
+            self._start_worker()
+        try:
+            self._queue.put_nowait(
+                (candidate, stats, (temp, hr, rr, sys_bp, dia_bp), active_high)
+            )
+        except queue.Full:
+            stats.dropped += np.size(active_high)
+
+    def _start_worker(self):
+        with self._worker_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run_shadow, name="vitalmine-shadow", daemon=True
+                )
+                self._thread.start()
+
+    def _run_shadow(self):
+        while True:
+            candidate, stats, vitals, active_high = self._queue.get()
+            active_high = np.atleast_1d(np.asarray(active_high, dtype=bool))
+            try:
+                vitals = [np.atleast_1d(v) for v in vitals]
+                candidate_high = candidate.scorer.predict_batch(*vitals) == 1
+                stats.record(active_high, candidate_high)
+            except Exception:
+                stats.errors += len(active_high)
+
+    def status(self):
+        return {
+            "active": self.active and self.active.version,
+            "shadow": self.candidate and self.candidate.version,
+            "shadow_stats": self.shadow_stats and self.shadow_stats.as_dict(),
+            "shadow_queue": self._queue.qsize(),
+            "last_error": self.last_error,
+        }
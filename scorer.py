@@ -0,0 +1,214 @@
+import numpy as np
+
+# --- COMPILED SIRS SCORER ---
+# sirs_model.pkl is a linear classifier over a few vitals, so a prediction
+# is just a sign check on a short dot product. Pulling the weights out once
+# at load time lets add_vitals skip building a pandas DataFrame and going
+# through sklearn's validation on every reading.
+#
+# Two kinds of artifact are understood: the original LogisticRegression
+# over (temp, hr, rr, wbc) from train_model.py, and the scaler + SGD
+# pipelines from training.py, whose standardisation is folded into the
+# weights. Vitals a model doesn't use simply get a zero weight.
+#
+# Unpickling a model imports sklearn, which costs more than the rest of the
+# app put together, so joblib is only imported by load_scorer. as_dict()
+# gives the compiled weights as plain JSON for callers (the model registry)
+# that want to load a model again without it.
+
+FEATURES = ("temp", "hr", "rr", "wbc")
+VITAL_FEATURES = ("temp", "hr", "rr", "sys_bp", "dia_bp", "wbc")
+
+# The wearables don't measure WBC; add_vitals has always fed a normal count.
+DEFAULT_WBC = 8000.0
+# Same fallbacks as add_vitals when a device sends no blood pressure
+DEFAULT_SYS_BP = 120
+DEFAULT_DIA_BP = 80
+
+
+class CompiledScorer:
+    def __init__(self, coef, intercept, classes, features=FEATURES):
+        unknown = set(features) - set(VITAL_FEATURES)
+        if unknown:
+            raise ValueError(f"Unexpected model features: {sorted(unknown)}")
+        self.features = tuple(features)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        weights = dict(zip(self.features, self.coef))
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+        (
+            self.w_temp,
+            self.w_hr,
+            self.w_rr,
+            self.w_sys_bp,
+            self.w_dia_bp,
+            self.w_wbc,
+        ) = (float(weights.get(f, 0.0)) for f in VITAL_FEATURES)
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Extracts the weights from a fitted binary linear classifier, or from
+        a (StandardScaler, classifier) Pipeline.
+        """
+        scaler = None
+        steps = getattr(model, "steps", None)
+        if steps:
+            if len(steps) != 2:
+                raise ValueError("Expected a scaler + classifier pipeline.")
+            scaler, model = steps[0][1], steps[1][1]
+
+        names = getattr(
+            scaler if scaler is not None else model, "feature_names_in_", None
+        )
+        features = FEATURES if names is None else tuple(names)
+        if model.coef_.shape != (1, len(features)):
+            raise ValueError("Only binary linear models are supported.")
+
+        coef, intercept = model.coef_[0], model.intercept_[0]
+        if scaler is not None:
+            # w . (x - mean) / scale + b  ==  (w / scale) . x + (b - w . mean / scale)
+            coef = coef / scaler.scale_
+            intercept = intercept - np.dot(coef, scaler.mean_)
+        return cls(coef, intercept, model.classes_, features)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["coef"], data["intercept"], data["classes"], data["features"])
+
+    def as_dict(self):
+        return {
+            "features": list(self.features),
+            "coef": self.coef.tolist(),
+            "intercept": self.intercept,
+            "classes": self.classes.tolist(),
+        }
+
+    def decision_one(
+        self,
+        temp,
+        hr,
+        rr,
+        sys_bp=DEFAULT_SYS_BP,
+        dia_bp=DEFAULT_DIA_BP,
+        wbc=DEFAULT_WBC,
+    ):
+        return (
+            temp * self.w_temp
+            + hr * self.w_hr
+            + rr * self.w_rr
+            + sys_bp * self.w_sys_bp
+            + dia_bp * self.w_dia_bp
+            + wbc * self.w_wbc
+            + self.intercept
+        )
+
+    def predict_one(
+        self,
+        temp,
+        hr,
+        rr,
+        sys_bp=DEFAULT_SYS_BP,
+        dia_bp=DEFAULT_DIA_BP,
+        wbc=DEFAULT_WBC,
+    ):
+        """Scores a single reading with plain float arithmetic."""
+        score = self.decision_one(temp, hr, rr, sys_bp, dia_bp, wbc)
+        return self.classes[int(score > 0)]
+
+    def decision_batch(
+        self,
+        temp,
+        hr,
+        rr,
+        sys_bp=DEFAULT_SYS_BP,
+        dia_bp=DEFAULT_DIA_BP,
+        wbc=DEFAULT_WBC,
+    ):
+        vitals = dict(zip(VITAL_FEATURES, (temp, hr, rr, sys_bp, dia_bp, wbc)))
+        # Only the columns the model has weights for
+        X = np.column_stack(
+            np.broadcast_arrays(
+                *(np.asarray(vitals[f], dtype=np.float64) for f in self.features)
+            )
+        )
+        return X @ self.coef + self.intercept
+
+    def predict_batch(
+        self,
+        temp,
+        hr,
+        rr,
+        sys_bp=DEFAULT_SYS_BP,
+        dia_bp=DEFAULT_DIA_BP,
+        wbc=DEFAULT_WBC,
+    ):
+        """Scores arrays of readings in one NumPy pass."""
+        scores = self.decision_batch(temp, hr, rr, sys_bp, dia_bp, wbc)
+        return self.classes[(scores > 0).astype(int)]
+
+
+def load_scorer(path="sirs_model.pkl"):
+    """Unpickles the model and compiles it. Returns None if it can't be used."""
+    try:
+        import joblib
+
+        return CompiledScorer.from_model(joblib.load(path))
+    except Exception:
+        return None
+
+
+# --- TEST ZONE (This runs only when you play this file) ---
+if __name__ == "__main__":
+    import timeit
+    import joblib
+    import pandas as pd
+
+    print("--- Compiled Scorer vs pandas + sklearn ---")
+
+    model = joblib.load("sirs_model.pkl")
+    scorer = CompiledScorer.from_model(model)
+
+    rng = np.random.default_rng(7)
+    n = 100_000
+    temp = np.round(rng.uniform(34.0, 41.0, n), 1)
+    hr = rng.integers(40, 150, n)
+    rr = rng.integers(8, 35, n)
+    wbc = np.full(n, DEFAULT_WBC)
+
+    df = pd.DataFrame({"temp": temp, "hr": hr, "rr": rr, "wbc": wbc})
+    expected = model.predict(df)
+    expected_scores = model.decision_function(df)
+
+    batch = scorer.predict_batch(temp, hr, rr)
+    single = np.array(
+        [scorer.predict_one(float(temp[i]), int(hr[i]), int(rr[i])) for i in range(n)]
+    )
+    closest = np.min(np.abs(expected_scores))
+    print(f"Rows checked:        {n} (closest score to boundary: {closest:.2e})")
+    print(f"Batch mismatches:    {int((batch != expected).sum())} (Should be 0)")
+    print(f"Single mismatches:   {int((single != expected).sum())} (Should be 0)")
+    score_diff = np.max(np.abs(scorer.decision_batch(temp, hr, rr) - expected_scores))
+    print(f"Max score drift:     {score_diff:.2e}")
+
+    # Microbenchmark: the add_vitals hot path, one reading at a time
+    def sklearn_one():
+        row = pd.DataFrame([[37.2, 88, 18, 8000.0]], columns=list(FEATURES))
+        return model.predict(row)[0]
+
+    def compiled_one():
+        return scorer.predict_one(37.2, 88, 18)
+
+    loops = 2000
+    t_sklearn = timeit.timeit(sklearn_one, number=loops) / loops
+    t_compiled = timeit.timeit(compiled_one, number=loops) / loops
+    print(f"\nSingle reading  sklearn: {t_sklearn * 1e6:9.1f} us")
+    print(f"Single reading compiled: {t_compiled * 1e6:9.1f} us")
+    print(f"Speedup:                 {t_sklearn / t_compiled:9.0f}x")
+
+    t_sklearn = timeit.timeit(lambda: model.predict(df), number=10) / 10
+    t_compiled = (
+        timeit.timeit(lambda: scorer.predict_batch(temp, hr, rr), number=10) / 10
+    )
+    print(f"\nBatch of {n}  sklearn: {t_sklearn * 1e3:7.2f} ms")
+    print(f"Batch of {n} compiled: {t_compiled * 1e3:7.2f} ms")
@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from werkzeug.security import generate_password_hash
+
+from counters import rebuild_counters
+from latest import rebuild_latest
+from models import db, Entry, User
+from triage import triage_batch, STATUS_LABELS, ADVICE_TEXT
+
+# --- SYNTHETIC WARD SEEDING ---
+# Fills a database with patients and their vitals for capacity testing,
+# without going through the ORM one object at a time. Each patient follows
+# one of the wearable_device.py scenarios as a trajectory over their stay,
+# readings are generated a batch at a time with NumPy, scored by the same
+# triage engine (and SIRS model) as add_vitals, and written with a Core
+# executemany per batch. The KPI counters and latest-reading projection are
+# rebuilt once at the end.
+
+SCENARIOS = ("stable", "sepsis", "hypothermia")
+DEFAULT_MIX = (0.8, 0.15, 0.05)
+
+# Per scenario: vitals on admission and by the end of the stay, as
+# (temp, hr, rr, sys_bp, dia_bp). Patients drift from one to the other.
+TRAJECTORY_START = np.array(
+    [
+        [37.0, 78, 16, 118, 76],
+        [37.3, 86, 17, 118, 76],
+        [36.6, 72, 15, 114, 74],
+    ]
+)
+TRAJECTORY_END = np.array(
+    [
+        [37.0, 78, 16, 118, 76],
+        [39.0, 120, 27, 100, 64],
+        [34.0, 38, 8, 82, 52],
+    ]
+)
+NOISE = np.array([0.3, 5, 1.5, 7, 5])
+FLOORS = np.array([30.0, 25, 4, 50, 30])
+
+BLOOD_GROUPS = np.array(["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"])
+GENDERS = np.array(["Male", "Female"])
+
+
+def next_seed_number(prefix):
+    """
+    Carries on numbering after earlier seeding runs with the same prefix:
+    one past the highest numeric suffix taken, so deleted patients leave a
+    gap rather than a clash.
+    """
+    names = (
+        db.session.query(User.username)
+        .filter(User.username.startswith(prefix, autoescape=True))
+        .all()
+    )
+    taken = [
+        int(name[len(prefix) :]) for (name,) in names if name[len(prefix) :].isdecimal()
+    ]
+    return max(taken, default=-1) + 1
+
+
+def seed_patients(rng, n_patients, prefix="seed_patient_", password="password123"):
+    """Inserts patient accounts. Returns (user_ids, usernames) as arrays."""
+    first = next_seed_number(prefix)
+    usernames = [f"{prefix}{i}" for i in range(first, first + n_patients)]
+    hashed = generate_password_hash(password)
+    ages = rng.integers(18, 95, n_patients).tolist()
+    genders = GENDERS[rng.integers(0, 2, n_patients)].tolist()
+    blood_groups = BLOOD_GROUPS[rng.integers(0, 8, n_patients)].tolist()
+
+    inserted = db.session.execute(
+        db.insert(User).returning(User.id, sort_by_parameter_order=True),
+        [
+            {
+                "username": username,
+                "password": hashed,
+                "role": "patient",
+                "age": age,
+                "gender": gender,
+                "blood_group": blood_group,
+            }
+            for username, age, gender, blood_group in zip(
+                usernames, ages, genders, blood_groups
+            )
+        ],
+    )
+    user_ids = np.array(inserted.scalars().all())
+    db.session.commit()
+    return user_ids, np.array(usernames, dtype=object)
+
+
+def vitals_trajectories(rng, scenario, progress):
+    """
+    One reading per element: scenario codes and how far (0-1) through the
+    stay each reading is. Returns temp, hr, rr, sys_bp, dia_bp arrays.
+    """
+    start = TRAJECTORY_START[scenario]
+    end = TRAJECTORY_END[scenario]
+    # Deterioration picks up towards the end of the stay
+    drift = (end - start) * (progress**2)[:, None]
+    values = start + drift + rng.standard_normal(start.shape) * NOISE
+    values = np.maximum(values, FLOORS)
+    temp = np.round(values[:, 0], 1)
+    hr, rr, sys_bp, dia_bp = np.rint(values[:, 1:]).astype(np.int64).T
+    return temp, hr, rr, sys_bp, dia_bp
+
+
+def seed_ward(
+    n_patients,
+    readings_per_patient,
+    days=30,
+    mix=DEFAULT_MIX,
+    scorer=None,
+    batch_size=50_000,
+    random_seed=None,
+    prefix="seed_patient_",
+    password="password123",
+    on_batch=None,
+):
+    """
+    Seeds n_patients with readings_per_patient readings each, spaced evenly
+    over the last `days` days. Readings are inserted in time order across
+    the ward, as they would have arrived. on_batch(rows_done, rows_total)
+    is called after each committed batch. Returns the number of readings.
+    """
+    rng = np.random.default_rng(random_seed)
+    user_ids, usernames = seed_patients(rng, n_patients, prefix, password)
+    mix = np.asarray(mix, dtype=np.float64)
+    scenarios = rng.choice(len(SCENARIOS), n_patients, p=mix / mix.sum())
+
+    end = np.datetime64(datetime.utcnow().replace(microsecond=0), "us")
+    interval = np.timedelta64(timedelta(days=days) // readings_per_patient, "us")
+    # Devices aren't synchronised: each one reports at its own offset
+    offsets = (rng.random(n_patients) * interval).astype("timedelta64[us]")
+    start = end - interval * readings_per_patient
+
+    statuses = np.array(STATUS_LABELS, dtype=object)
+    advice = np.array(ADVICE_TEXT, dtype=object)
+    insert = Entry.__table__.insert()
+    total = n_patients * readings_per_patient
+
+    for offset in range(0, total, batch_size):
+        rows = np.arange(offset, min(offset + batch_size, total))
+        patient = rows % n_patients
+        step = rows // n_patients
+        progress = step / max(1, readings_per_patient - 1)
+
+        temp, hr, rr, sys_bp, dia_bp = vitals_trajectories(
+            rng, scenarios[patient], progress
+        )
+        ai_high = None
+        if scorer:
+            ai_high = scorer.predict_batch(temp, hr, rr, sys_bp, dia_bp) == 1
+        status_codes, advice_codes = triage_batch(temp, hr, rr, sys_bp, dia_bp, ai_high)
+        timestamps = start + step * interval + offsets[patient]
+
+        columns = {
+            "user_id": user_ids[patient].tolist(),
+            "name": usernames[patient].tolist(),
+            "temp": temp.tolist(),
+            "hr": hr.tolist(),
+            "rr": rr.tolist(),
+            "sys_bp": sys_bp.tolist(),
+            "dia_bp": dia_bp.tolist(),
+            "status": statuses[status_codes].tolist(),
+            "advice": advice[advice_codes].tolist(),
+            "timestamp": timestamps.tolist(),
+        }
+        db.session.execute(
+            insert, [dict(zip(columns, values)) for values in zip(*columns.values())]
+        )
+        db.session.commit()
+        if on_batch:
+            on_batch(offset + len(rows), total)
+
+    rebuild_counters()
+    rebuild_latest()
+    return total
@@ -0,0 +1,251 @@
+import numpy as np
+
+# --- TRIAGE ENGINE ---
+# The Critical / Warning / Stable decision tree used by add_vitals, written
+# over NumPy arrays so a whole ward can be rescored in a single pass.
+# Statuses and advice are returned as small integer codes; use the lookup
+# tables below to turn them back into the strings stored on Entry.
+
+STABLE, WARNING, CRITICAL = 0, 1, 2
+STATUS_LABELS = ("Stable", "Warning", "Critical")
+
+ADVICE_TEXT = (
+    # Critical
+    "CRITICAL: Severe Hypotension (Shock). Seek immediate care.",
+    "CRITICAL: Severe Bradycardia. High risk of cardiac arrest.",
+    "CRITICAL: Respiratory failure detected. Intubation risk.",
+    "CRITICAL: Severe vitals detected. Code Blue parameters met.",
+    # Warning
+    "AI Warning: Model indicates early SIRS/Sepsis trajectory.",
+    "Bradycardia detected. Monitor heart rate.",
+    "Abnormal respiratory rate. Assess airway.",
+    "Hypertension detected. Monitor blood pressure.",
+    "Abnormal body temperature detected.",
+    "Tachycardia. Rest and re-check.",
+    "Warning: Abnormal vitals detected. Monitor closely.",
+    # Stable
+    "Vitals are normal. Continue standard care.",
+)
+(
+    ADV_SHOCK,
+    ADV_BRADYCARDIA_SEVERE,
+    ADV_RESP_FAILURE,
+    ADV_CODE_BLUE,
+    ADV_AI_SIRS,
+    ADV_BRADYCARDIA,
+    ADV_RESP_RATE,
+    ADV_HYPERTENSION,
+    ADV_TEMPERATURE,
+    ADV_TACHYCARDIA,
+    ADV_ABNORMAL,
+    ADV_NORMAL,
+) = range(len(ADVICE_TEXT))
+
+
+def triage_batch(temp, hr, rr, sys_bp, dia_bp, ai_high=None):
+    """
+    Scores a batch of readings. Every argument is array-like and of equal
+    length; ai_high is an optional boolean array of AI model flags.
+    Returns (status_codes, advice_codes) as int8 arrays.
+    """
+    temp = np.asarray(temp, dtype=np.float64)
+    hr = np.asarray(hr, dtype=np.int64)
+    rr = np.asarray(rr, dtype=np.int64)
+    sys_bp = np.asarray(sys_bp, dtype=np.int64)
+    dia_bp = np.asarray(dia_bp, dtype=np.int64)
+    if ai_high is None:
+        ai_high = np.zeros(temp.shape, dtype=bool)
+    else:
+        ai_high = np.asarray(ai_high, dtype=bool)
+
+    # Critical triggers
+    is_hypotensive = (sys_bp <= 90) | (dia_bp <= 60)
+    is_hypertensive_crisis = (sys_bp >= 180) | (dia_bp >= 120)
+    is_severe_bradycardia = hr <= 40
+    is_severe_resp = (rr >= 30) | (rr <= 8)
+    is_critical = (
+        (hr >= 130)
+        | is_severe_bradycardia
+        | (temp >= 39.5)
+        | (temp <= 35.0)
+        | is_hypotensive
+        | is_hypertensive_crisis
+        | is_severe_resp
+    )
+
+    # Warning triggers
+    is_brady = hr < 60
+    is_abnormal_rr = (rr > 20) | (rr < 12)
+    is_hypertensive = (sys_bp >= 140) | (dia_bp >= 90)
+    is_abnormal_temp = (temp >= 38.1) | (temp < 36.0)
+    is_tachy = hr > 100
+    is_warning = ~is_critical & (
+        ai_high
+        | is_brady
+        | is_abnormal_rr
+        | is_hypertensive
+        | is_abnormal_temp
+        | is_tachy
+    )
+
+    status = np.full(temp.shape, STABLE, dtype=np.int8)
+    status[is_warning] = WARNING
+    status[is_critical] = CRITICAL
+
+    # np.select picks the first matching condition, mirroring the elif chains
+    critical_advice = np.select(
+        [is_hypotensive, is_severe_bradycardia, is_severe_resp],
+        [ADV_SHOCK, ADV_BRADYCARDIA_SEVERE, ADV_RESP_FAILURE],
+        default=ADV_CODE_BLUE,
+    )
+    warning_advice = np.select(
+        [
+            ai_high,
+            is_brady,
+            is_abnormal_rr,
+            is_hypertensive,
+            is_abnormal_temp,
+            is_tachy,
+        ],
+        [
+            ADV_AI_SIRS,
+            ADV_BRADYCARDIA,
+            ADV_RESP_RATE,
+            ADV_HYPERTENSION,
+            ADV_TEMPERATURE,
+            ADV_TACHYCARDIA,
+        ],
+        default=ADV_ABNORMAL,
+    )
+    advice = np.select(
+        [is_critical, is_warning], [critical_advice, warning_advice], default=ADV_NORMAL
+    ).astype(np.int8)
+
+    return status, advice
+
+
+def triage_reading(temp, hr, rr, sys_bp, dia_bp, ai_high=False):
+    """
+    Scores a single reading through the batch engine.
+    Returns (status, advice_text) exactly as they are stored on Entry.
+    """
+    status, advice = triage_batch([temp], [hr], [rr], [sys_bp], [dia_bp], [ai_high])
+    return STATUS_LABELS[status[0]], ADVICE_TEXT[advice[0]]
+
+
+def _scalar_triage(temp, hr, rr, sys_bp, dia_bp, ai_high=False):
+    """
+    The original inline if-chain from add_vitals, kept as the reference
+    implementation for the differential check below.
+    """
+    is_hypotensive = sys_bp <= 90 or dia_bp <= 60
+    is_hypertensive_crisis = sys_bp >= 180 or dia_bp >= 120
+    is_severe_bradycardia = hr <= 40
+    is_severe_tachypnea = rr >= 30
+    is_severe_bradypnea = rr <= 8
+    is_severe_hypothermia = temp <= 35.0
+
+    if (
+        hr >= 130
+        or is_severe_bradycardia
+        or temp >= 39.5
+        or is_severe_hypothermia
+        or is_hypotensive
+        or is_hypertensive_crisis
+        or is_severe_tachypnea
+        or is_severe_bradypnea
+    ):
+        status = "Critical"
+        if is_hypotensive:
+            advice_text = "CRITICAL: Severe Hypotension (Shock). Seek immediate care."
+        elif is_severe_bradycardia:
+            advice_text = "CRITICAL: Severe Bradycardia. High risk of cardiac arrest."
+        elif is_severe_tachypnea or is_severe_bradypnea:
+            advice_text = "CRITICAL: Respiratory failure detected. Intubation risk."
+        else:
+            advice_text = "CRITICAL: Severe vitals detected. Code Blue parameters met."
+
+    elif (
+        ai_high
+        or sys_bp >= 140
+        or dia_bp >= 90
+        or temp >= 38.1
+        or temp < 36.0
+        or hr > 100
+        or hr < 60
+        or rr > 20
+        or rr < 12
+    ):
+        status = "Warning"
+        advice_text = "Warning: Abnormal vitals detected. Monitor closely."
+
+        if ai_high:
+            advice_text = "AI Warning: Model indicates early SIRS/Sepsis trajectory."
+        elif hr < 60:
+            advice_text = "Bradycardia detected. Monitor heart rate."
+        elif rr > 20 or rr < 12:
+            advice_text = "Abnormal respiratory rate. Assess airway."
+        elif sys_bp >= 140 or dia_bp >= 90:
+            advice_text = "Hypertension detected. Monitor blood pressure."
+        elif temp >= 38.1 or temp < 36.0:
+            advice_text = "Abnormal body temperature detected."
+        elif hr > 100:
+            advice_text = "Tachycardia. Rest and re-check."
+
+    else:
+        status = "Stable"
+        advice_text = "Vitals are normal. Continue standard care."
+
+    return status, advice_text
+
+
+# --- TEST ZONE (This runs only when you play this file) ---
+if __name__ == "__main__":
+    print("--- Differential Test: Batch Engine vs Scalar Path ---")
+
+    rng = np.random.default_rng(2026)
+    n = 200_000
+    half = n // 2
+
+    def grid(low, high, wide_low, wide_high, integer=True):
+        # Half the rows sit near the Stable/Warning band, half span every
+        # threshold so each branch of the tree gets exercised.
+        draw = rng.integers if integer else rng.uniform
+        values = np.concatenate(
+            [draw(low, high, half), draw(wide_low, wide_high, n - half)]
+        )
+        return values if integer else np.round(values, 1)
+
+    # One decimal place temps, like the forms and wearables send
+    temp = grid(35.5, 38.5, 33.0, 41.0, integer=False)
+    hr = grid(55, 110, 25, 160)
+    rr = grid(10, 23, 4, 40)
+    sys_bp = grid(95, 150, 70, 200)
+    dia_bp = grid(62, 95, 40, 130)
+    ai_high = rng.random(n) < 0.2
+
+    status, advice = triage_batch(temp, hr, rr, sys_bp, dia_bp, ai_high)
+
+    mismatches = 0
+    for i in range(n):
+        expected = _scalar_triage(
+            float(temp[i]),
+            int(hr[i]),
+            int(rr[i]),
+            int(sys_bp[i]),
+            int(dia_bp[i]),
+            bool(ai_high[i]),
+        )
+        got = (STATUS_LABELS[status[i]], ADVICE_TEXT[advice[i]])
+        if got != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"Mismatch at row {i}: {got} != {expected}")
+
+    counts = {
+        label: int((status == code).sum()) for code, label in enumerate(STATUS_LABELS)
+    }
+    print(f"Rows checked:   {n} {counts}")
+    print(f"Advice codes:   {len(np.unique(advice))} of {len(ADVICE_TEXT)} exercised")
+    print(f"Mismatches:     {mismatches} (Should be 0)")
+    raise SystemExit(1 if mismatches else 0)